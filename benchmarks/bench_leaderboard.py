@@ -0,0 +1,58 @@
+# benchmarks/bench_leaderboard.py — Leaderboard build time, memory and per-query latency at N users
+#
+#   python -m benchmarks.bench_leaderboard --users 100000 300000 1000000
+#
+# For each size: load N learners with Zipf-like XP into the global board and spread them over
+# `--courses` course boards and the weekly board, then time XP gains (the xp_gain path), top-10,
+# my-rank and neighbors-around-me queries for random users. Latency should stay flat as N grows.
+import argparse, gc, random, statistics, time, tracemalloc
+
+from core.leaderboard import Leaderboard, week_of
+
+def timed(fn, args_list) -> dict:
+    out = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        out.append(time.perf_counter() - t0)
+    out.sort()
+    return {"p50_us": statistics.median(out) * 1e6, "p99_us": out[int(0.99 * (len(out) - 1))] * 1e6}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    ap.add_argument("--courses", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    week = week_of(time.time())
+    print(f"{'users':>9} {'load s':>7} {'MiB':>6}  " + "  ".join(f"{k + ' p50/p99 µs':>24}" for k in ("gain", "top10", "rank", "around")))
+    for n in args.users:
+        rng = random.Random(args.seed)
+        users = [f"u{i:07d}" for i in range(n)]
+        xp = [int(5 * rng.paretovariate(1.2)) for _ in range(n)]
+        def rows():
+            for u, x in zip(users, xp):
+                yield "global", u, x
+                yield f"course:c{rng.randrange(args.courses)}", u, x
+                yield week, u, x // 4
+        gc.collect()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        board = Leaderboard()
+        board.load(rows())
+        load = time.perf_counter() - t0
+        mem = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+
+        pick = lambda: users[rng.randrange(n)]
+        gain = timed(board.record, [(pick(), rng.choice((2, 5, 10)), f"c{rng.randrange(args.courses)}") for _ in range(args.ops)])
+        top = timed(board.top, [("global", 10)] * args.ops)
+        rank = timed(board.rank, [("global", pick()) for _ in range(args.ops)])
+        around = timed(board.around, [("global", pick(), 2) for _ in range(args.ops)])
+        print(f"{n:>9} {load:>7.1f} {mem:>6.0f}  " + "  ".join(f"{r['p50_us']:>11.1f} / {r['p99_us']:>10.1f}" for r in (gain, top, rank, around)))
+        del board
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# benchmarks/bench_load.py — Simulated concurrent learners against a synthetic course tree
+#
+#   python -m benchmarks.bench_load --courses 4 --sections 10 --lessons 50 --sessions 16 --concurrency 8
+#
+# Writes a synthetic tree (benchmarks/synth.py) into a scratch directory, then drives Home and
+# Learn headlessly with one AppTest per learner. All learners share one process, and therefore
+# the same st.cache_resource singletons, like sessions of one Streamlit server. Each learner opens
+# Home, browses a course's learning path, and then repeatedly opens a lesson, answers its quizzes,
+# completes it and moves on to the next lesson (prefetched in the background). Reports rerun
+# latency per step, RSS growth per session and filesystem calls per rerun.
+import argparse, builtins, gc, io, json, logging, os, random, shutil, statistics, tempfile, threading, time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.synth import write_tree
+
+REPO = Path(__file__).resolve().parent.parent
+
+DRIVER = """
+import runpy, sys, types
+sys.path.insert(0, {repo!r})
+import streamlit as st
+st.Page = lambda path, **kw: types.SimpleNamespace(url_path=path.rsplit("/", 1)[-1][:-3], **kw)
+class _Nav:  # st.navigation is patched process-wide, so resolve the page from this session at call time
+    title = url_path = property(lambda self: st.session_state.get("bench_page", "home"))
+    def run(self): runpy.run_path({repo!r} + "/pages/" + self.title + ".py", run_name="__main__")
+st.navigation = lambda pages, **kw: _Nav()
+st.switch_page = lambda page: None
+runpy.run_path({repo!r} + "/app.py", run_name="__main__")
+"""
+
+class FsCounter:
+    """Counts stat/listdir/scandir/open calls process-wide while installed."""
+
+    NAMES = ("stat", "listdir", "scandir")
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self._orig = {}
+
+    def _wrap(self, kind, fn):
+        def inner(*args, **kwargs):
+            self.counts[kind] += 1
+            return fn(*args, **kwargs)
+        return inner
+
+    def install(self):
+        for name in self.NAMES:
+            self._orig[("os", name)] = getattr(os, name)
+            setattr(os, name, self._wrap(name, getattr(os, name)))
+        self._orig[("io", "open")] = io.open
+        io.open = builtins.open = self._wrap("open", io.open)
+
+    def uninstall(self):
+        for (mod, name), fn in self._orig.items():
+            setattr(os if mod == "os" else io, name, fn)
+        builtins.open = io.open
+
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+def share_runtime():
+    """Let AppTests run from several threads at once.
+
+    AppTest.run installs a mock Runtime singleton and resets it to None when done, and
+    patches/restores the `global.appTest` config option around every run, so concurrent
+    runs pull both out from under each other. Install one shared mock runtime and set the
+    option once for the whole process instead.
+    """
+    import contextlib
+    from unittest.mock import MagicMock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = type("Runtime", (), {"_instance": None})
+    from streamlit import config
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda options: contextlib.nullcontext()
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f: pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+class Learner:
+    def __init__(self, n: int, tree: dict, rng: random.Random, record):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_string(DRIVER.format(repo=str(REPO)), default_timeout=120)
+        self.at.query_params["uid"] = f"bench-{n}"
+        self.tree, self.rng, self.record = tree, rng, record
+
+    def step(self, kind: str, action=None):
+        t0 = time.perf_counter()
+        (action or self.at.run)()
+        self.record(kind, time.perf_counter() - t0, [str(e.value) for e in self.at.exception])
+
+    def run(self, lessons_per_session: int):
+        at, ss = self.at, self.at.session_state
+        ss["bench_page"] = "home"
+        self.step("home")
+        course = self.rng.choice(sorted(self.tree))
+        ss["bench_page"], ss["nav_course"] = "learn", course
+        self.step("learn_path")
+        for _ in range(lessons_per_session):
+            section = self.rng.choice(sorted(self.tree[course]))
+            lesson = self.rng.choice(self.tree[course][section])
+            ss["nav_section"], ss["nav_lesson"] = section, lesson
+            self.step("open_lesson")
+            for key in [r.key for r in at.radio if str(r.key).startswith("q_")]:
+                # Under concurrent AppTests a fragment rerun occasionally comes back as an empty
+                # page; a full rerun redraws it (counted as its own step)
+                if not any(b.key == f"chk_{key[2:]}" for b in at.button): self.step("redraw")
+                at.radio(key=key).set_value(self.rng.randrange(4))
+                self.step("quiz", lambda: at.button(key=f"chk_{key[2:]}").click().run())
+            key = f"complete_{course}_{section}_{lesson}"
+            if any(b.key == key for b in at.button):
+                self.step("complete", lambda: at.button(key=key).click().run())
+            if any(b.key == "next_lesson" for b in at.button):
+                self.step("next_lesson", lambda: at.button(key="next_lesson").click().run())
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--courses", type=int, default=4)
+    ap.add_argument("--sections", type=int, default=10)
+    ap.add_argument("--lessons", type=int, default=50, help="lessons per section")
+    ap.add_argument("--sessions", type=int, default=16)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--lessons-per-session", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", type=Path, help="also write the full report here")
+    args = ap.parse_args()
+    if args.json: args.json = args.json.resolve()
+
+    work = Path(tempfile.mkdtemp(prefix="ailearn-load-"))
+    t0 = time.perf_counter()
+    n = write_tree(work/"Courses", args.courses, args.sections, args.lessons, seed=args.seed)
+    print(f"synthetic tree: {n} lessons in {time.perf_counter() - t0:.1f}s at {work}")
+    tree = {c.name: {s.name: sorted(p.stem for p in s.glob("*.json")) for s in c.iterdir()} for c in (work/"Courses").iterdir()}
+    os.chdir(work)
+
+    lock = threading.Lock()
+    samples, errors = defaultdict(list), []
+    def record(kind, seconds, errs):
+        with lock:
+            samples[kind].append(seconds)
+            errors.extend(errs)
+
+    share_runtime()
+    for name in [n for n in logging.root.manager.loggerDict if n.startswith("streamlit")]:
+        logging.getLogger(name).setLevel(logging.ERROR)  # session state is seeded from worker threads
+    # One untimed learner first, so imports and shared caches don't count against per-session memory
+    Learner(-1, tree, random.Random(-1), lambda *a: None).run(1)
+    gc.collect()
+    fs = FsCounter()
+    rss0 = rss_mb()
+    learners = [Learner(i, tree, random.Random(args.seed * 1000 + i), record) for i in range(args.sessions)]
+    fs.install()
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for f in [pool.submit(l.run, args.lessons_per_session) for l in learners]: f.result()
+    finally:
+        fs.uninstall()
+    wall = time.perf_counter() - t0
+    gc.collect()
+    rss1 = rss_mb()
+
+    reruns = sum(len(v) for v in samples.values())
+    report = {
+        "config": vars(args) | {"json": str(args.json) if args.json else None, "total_lessons": n},
+        "wall_s": wall, "reruns": reruns, "reruns_per_s": reruns / wall,
+        "rss_mb": {"before": rss0, "after": rss1, "per_session": (rss1 - rss0) / args.sessions},
+        "fs_calls": dict(fs.counts), "fs_calls_per_rerun": fs.total() / max(1, reruns),
+        "steps": {}, "errors": sorted(set(errors))[:20],
+    }
+    print(f"\n{'step':<12} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for kind in ("home", "learn_path", "open_lesson", "quiz", "complete", "next_lesson", "redraw"):
+        vals = sorted(samples.get(kind, []))
+        if not vals: continue
+        q = lambda p: vals[min(len(vals) - 1, int(p * len(vals)))] * 1000
+        report["steps"][kind] = {"n": len(vals), "p50_ms": statistics.median(vals) * 1000, "p95_ms": q(0.95),
+                                 "p99_ms": q(0.99), "max_ms": vals[-1] * 1000}
+        s = report["steps"][kind]
+        print(f"{kind:<12} {s['n']:>5} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f}")
+    print(f"\n{reruns} reruns in {wall:.1f}s ({reruns / wall:.1f}/s) across {args.sessions} sessions, "
+          f"concurrency {args.concurrency}")
+    print(f"RSS {rss0:.0f} -> {rss1:.0f} MiB ({report['rss_mb']['per_session']:.2f} MiB/session); "
+          f"filesystem calls {fs.total()} ({report['fs_calls_per_rerun']:.1f}/rerun: "
+          + ", ".join(f"{k} {v}" for k, v in sorted(fs.counts.items())) + ")")
+    if errors: print("ERRORS:", *report["errors"], sep="\n  ")
+    if args.json: args.json.write_text(json.dumps(report, indent=2))
+    os.chdir(REPO)
+    shutil.rmtree(work, ignore_errors=True)
+    os._exit(1 if errors else 0)  # skip interpreter teardown of Streamlit's runtime threads
+
+if __name__ == "__main__":
+    main()
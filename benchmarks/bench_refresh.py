@@ -0,0 +1,89 @@
+# benchmarks/bench_refresh.py — Source refresh over a synthetic course whose pages live on a local web server
+#
+#   python -m benchmarks.bench_refresh --lessons 2000 --changed 20 --cosmetic 20
+#
+# Writes N lessons, each with its own source page served by benchmarks.stub_sources, then runs
+# the refresh pipeline (core.refresh) four times: a first run with no state, a run with nothing
+# changed, a run after editing the text of `--changed` pages and only the markup of `--cosmetic`
+# pages (whose stale lessons are regenerated through benchmarks.stub_agent and saved), and a
+# final run that should find nothing stale. Reports HTTP 200/304 counts, bytes downloaded and stale lessons per run.
+import argparse, json, random, shutil, tempfile, time
+from pathlib import Path
+
+from benchmarks.synth import _text, write_tree
+from benchmarks import stub_agent, stub_sources
+from core.agent_client import AgentClient
+from core.generation import GenerationQueue
+from core.refresh import SourceRefresher, lesson_sources
+from core.schema import LessonJSON
+
+def page(build: int, sections: list) -> str:
+    body = "".join(f"<h2>{h}</h2><p>{p}</p>" for h, p in sections)
+    return (f"<html><head><title>Source</title><script>window.BUILD={build}</script></head><body>"
+            f"<nav>Home · Docs · build {build}</nav><article>{body}</article><footer>© build {build}</footer></body></html>")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lessons", type=int, default=2000)
+    ap.add_argument("--changed", type=int, default=20, help="pages whose text changes")
+    ap.add_argument("--cosmetic", type=int, default=20, help="pages whose markup changes but not their text")
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="ailearn-refresh-"))
+    sections = 10
+    write_tree(work/"Courses", 1, sections, max(1, args.lessons // sections), seed=args.seed)
+    server, base, counts = stub_sources.serve(work/"sources")
+    rng = random.Random(args.seed)
+    pages = {}
+    lessons = sorted((work/"Courses").glob("*/*/*.json"))
+    for path in lessons:
+        rel = path.relative_to(work/"Courses").with_suffix(".html")
+        pages[rel] = [(_text(rng, 3)[:-1], _text(rng, 80)) for _ in range(3)]
+        (work/"sources"/rel).parent.mkdir(parents=True, exist_ok=True)
+        (work/"sources"/rel).write_text(page(1, pages[rel]), encoding="utf-8")
+    time.sleep(1.1)  # Last-Modified has one-second resolution; lessons are generated after their pages
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    for path in lessons:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["metadata"].update(source_url=f"{base}/{path.relative_to(work/'Courses').with_suffix('.html').as_posix()}", last_updated=stamp)
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    refresher = SourceRefresher(work/"sources.json", workers=args.workers)
+    agent, agent_url = stub_agent.serve(work/"Courses", delay=0)
+    client = AgentClient(agent_url)
+    def save(job, data):
+        path = work/"Courses"/job.course_key/job.section_key/f"{job.lesson_key}.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return path
+    queue = GenerationQueue(lambda payload: client.generate(payload, use_cache=False), lambda data: LessonJSON(**data), save,
+                            on_finish=lambda job: refresher.settle([job]))
+
+    print(f"{'run':<14} {'sources':>8} {'200':>6} {'304':>6} {'KiB':>8} {'stale':>6} {'generated':>10} {'seconds':>8}")
+    def run(name: str):
+        before = counts.copy()
+        jobs = refresher.refresh(lesson_sources(work/"Courses"))
+        generated = 0
+        if jobs:
+            batch = queue.submit(jobs)
+            while not queue.finished(batch): time.sleep(0.05)
+            generated = sum(j.status == "saved" for j in queue.jobs(batch))
+        r = refresher.last_run
+        print(f"{name:<14} {r['urls']:>8} {counts[200] - before[200]:>6} {counts[304] - before[304]:>6} {r['bytes'] / 1024:>8.0f} "
+              f"{r['stale']:>6} {generated:>10} {r['seconds']:>8.2f}")
+
+    run("first")
+    run("unchanged")
+    edited = rng.sample(sorted(pages), args.changed + args.cosmetic)
+    for n, rel in enumerate(edited):
+        if n < args.changed: pages[rel][0] = (pages[rel][0][0], _text(rng, 80))
+        (work/"sources"/rel).write_text(page(2, pages[rel]), encoding="utf-8")
+    run("after edits")
+    run("settled")
+    server.shutdown()
+    agent.shutdown()
+    shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
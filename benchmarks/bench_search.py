@@ -0,0 +1,51 @@
+# benchmarks/bench_search.py — Build the search index over N synthetic lessons and time queries
+#
+#   python -m benchmarks.bench_search --lessons 100000
+import argparse, random, statistics, tempfile, time
+from pathlib import Path
+
+from benchmarks.synth import VOCAB, WORDS, iter_lessons
+from core.search import SearchIndex
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lessons", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--db", type=Path, default=None, help="index file (default: temp dir)")
+    args = ap.parse_args()
+
+    courses, sections = 20, 10
+    per_section = max(1, args.lessons // (courses * sections))
+    db = args.db or Path(tempfile.mkdtemp())/"search.db"
+    index = SearchIndex(db, max_cached=0)  # time the queries themselves, not the result cache
+
+    t0 = time.perf_counter()
+    keys = []
+    def entries():
+        for c, s, l, d in iter_lessons(courses, sections, per_section):
+            keys.append((c, s, l))
+            yield c, s, l, "synthetic", lambda d=d: d
+    stats = index.sync(entries())
+    build = time.perf_counter() - t0
+    print(f"indexed {stats['indexed']} lessons in {build:.1f}s ({stats['indexed'] / build:.0f} lessons/s), "
+          f"db {db.stat().st_size / 2**20:.0f} MiB")
+
+    t0 = time.perf_counter()
+    stats = index.sync((c, s, l, "synthetic", dict) for c, s, l in keys)
+    print(f"no-op resync of {stats['unchanged']} lessons in {time.perf_counter() - t0:.2f}s")
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(args.queries)]  # common terms
+    queries += [rng.choice(VOCAB[len(WORDS):]) for _ in range(args.queries)]  # rare terms
+    queries += [rng.choice(WORDS)[:3] for _ in range(args.queries // 5)]  # prefixes
+    times = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, limit=10)
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    print(f"{len(times)} queries: p50 {statistics.median(times):.2f} ms, "
+          f"p95 {times[int(len(times) * 0.95)]:.2f} ms, max {times[-1]:.2f} ms")
+
+if __name__ == "__main__":
+    main()
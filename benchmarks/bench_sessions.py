@@ -0,0 +1,105 @@
+# benchmarks/bench_sessions.py — Server memory held per connected learner, at 1k and 10k sessions
+#
+#   python -m benchmarks.bench_sessions [--sessions 1000 10000] [--json sessions.json]
+#
+# Each size runs in a fresh interpreter against a synthetic course tree. A simulated session
+# opens a lesson on the Learn page, answers its quizzes and then opens a second lesson, the way
+# a learner's browser would drive it. Afterwards only its session state is kept, which is what
+# a Streamlit server holds for a connected session between reruns. Reported per size:
+# RSS growth per session, entries per session state and the bytes reachable from a session
+# state that weren't already alive before the sessions connected (i.e. not shared process-wide).
+import argparse, gc, json, logging, os, random, subprocess, sys, tempfile, time
+from pathlib import Path
+
+from benchmarks.bench_load import DRIVER, REPO, rss_mb, share_runtime
+from benchmarks.synth import write_tree
+
+def unique_bytes(root, shared_ids: set) -> int:
+    """sys.getsizeof total of everything reachable from `root` that isn't in `shared_ids`."""
+    seen, stack, total = set(), [root], 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in shared_ids: continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+def module_reachable() -> set:
+    seen, stack = set(), list(sys.modules.values())
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen: continue
+        seen.add(id(obj))
+        stack.extend(gc.get_referents(obj))
+    return seen
+
+def child(n: int, seed: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+    work = Path(tempfile.mkdtemp(prefix="ailearn-sessions-"))
+    write_tree(work/"Courses", 2, 4, 25, seed=seed)
+    tree = {c.name: {s.name: sorted(p.stem for p in s.glob("*.json")) for s in c.iterdir()} for c in (work/"Courses").iterdir()}
+    driver = work/"driver.py"
+    driver.write_text(DRIVER.format(repo=str(REPO)))
+    os.chdir(work)
+    share_runtime()
+    for name in [name for name in logging.root.manager.loggerDict if name.startswith("streamlit")]:
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+    rng, errors = random.Random(seed), []
+    def session(i: int):
+        at = AppTest.from_file(str(driver), default_timeout=120)
+        ss = at.session_state
+        at.query_params["uid"], ss["bench_page"] = f"mem-{i}", "learn"
+        ss["nav_course"] = course = rng.choice(sorted(tree))
+        for _ in range(2):
+            ss["nav_section"] = section = rng.choice(sorted(tree[course]))
+            ss["nav_lesson"] = rng.choice(tree[course][section])
+            at.run()
+            for radio in [r for r in at.radio if str(r.key).startswith("q_")]: radio.set_value(rng.randrange(4))
+        at.run()
+        errors.extend(str(e.value) for e in at.exception)
+        return ss
+
+    session(-1)  # imports and shared caches
+    gc.collect()
+    # Everything alive now is process-wide; a session's own bytes are what it reaches beyond this
+    shared = module_reachable()
+    rss0, t0 = rss_mb(), time.perf_counter()
+    states = [session(i) for i in range(n)]
+    wall = time.perf_counter() - t0
+    gc.collect()
+    rss1 = rss_mb()
+    sample = states[-20:]
+    return {"sessions": n, "wall_s": wall, "rss_before_mb": rss0, "rss_after_mb": rss1,
+            "kib_per_session": (rss1 - rss0) * 1024 / n,
+            "keys_per_session": sum(len(s.filtered_state) for s in sample) / len(sample),
+            "unique_kib_per_state": sum(unique_bytes(s, shared) for s in sample) / len(sample) / 1024,
+            "errors": sorted(set(errors))[:10]}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", type=Path, help="also write the results here")
+    ap.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child is not None:
+        print(json.dumps(child(args.child, args.seed)), flush=True)
+        os._exit(0)  # skip interpreter teardown of Streamlit's runtime threads
+
+    results = []
+    print(f"{'sessions':>9} {'RSS KiB/session':>16} {'state KiB':>10} {'keys':>6} {'wall s':>8}")
+    for n in args.sessions:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_sessions", "--child", str(n), "--seed", str(args.seed)],
+                             cwd=REPO, capture_output=True, text=True)
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if not lines: raise RuntimeError(f"{n} sessions: benchmark child failed\n{out.stderr[-2000:]}")
+        r = json.loads(lines[-1])
+        results.append(r)
+        print(f"{n:>9} {r['kib_per_session']:>16.1f} {r['unique_kib_per_state']:>10.1f} {r['keys_per_session']:>6.0f} "
+              f"{r['wall_s']:>8.0f}" + (f"  ERRORS: {r['errors']}" if r["errors"] else ""))
+    if args.json: args.json.write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_startup.py — Cold-start cost per page: import time and time-to-first-render
+#
+#   python -m benchmarks.bench_startup [--pages home learn review developer] [--repeat 3]
+#
+# Each sample runs in a fresh interpreter inside a scratch directory holding a copy of the
+# course tree, so module imports and the shared caches start cold. Reported per page:
+# `import_ms` (streamlit + AppTest), `first_render_ms` (first script run, including app.py and
+# every module it pulls in), `rerun_ms` (second run, warm) and which heavy modules got loaded.
+import argparse, json, os, shutil, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+HEAVY = ("pydantic", "requests", "bs4", "torch", "transformers")
+
+DRIVER = """
+import runpy, sys, types
+sys.path.insert(0, {repo!r})
+import streamlit as st
+st.Page = lambda path, **kw: types.SimpleNamespace(url_path=path.rsplit("/", 1)[-1][:-3], **kw)
+class _Nav:
+    title = url_path = "{page}"
+    def run(self): runpy.run_path({repo!r} + "/pages/{page}.py", run_name="__main__")
+st.navigation = lambda pages, **kw: _Nav()
+runpy.run_path({repo!r} + "/app.py", run_name="__main__")
+"""
+
+def child(page: str):
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    t1 = time.perf_counter()
+    at = AppTest.from_string(DRIVER.format(repo=str(REPO), page=page), default_timeout=120)
+    at.query_params["uid"] = "bench"
+    at.run()
+    t2 = time.perf_counter()
+    at.run()
+    t3 = time.perf_counter()
+    print(json.dumps({"page": page, "import_ms": (t1 - t0) * 1000, "first_render_ms": (t2 - t1) * 1000,
+                      "rerun_ms": (t3 - t2) * 1000, "errors": [str(e.value) for e in at.exception],
+                      "heavy": [m for m in HEAVY if m in sys.modules]}), flush=True)
+    os._exit(0)  # skip interpreter teardown of Streamlit's runtime threads
+
+def sample(page: str, courses: Path) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(courses, Path(tmp)/"Courses")
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", page], cwd=tmp,
+                             env=dict(os.environ, PYTHONPATH=str(REPO)), capture_output=True, text=True, timeout=300)
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if not lines: raise RuntimeError(f"{page}: benchmark child failed\n{out.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", nargs="+", default=["home", "learn", "review", "developer"])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--courses", type=Path, default=REPO/"courses")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child: return child(args.child)
+
+    print(f"{'page':<10} {'import ms':>10} {'first render ms':>16} {'rerun ms':>9}  heavy modules loaded")
+    for page in args.pages:
+        runs = [sample(page, args.courses) for _ in range(args.repeat)]
+        med = {k: statistics.median(r[k] for r in runs) for k in ("import_ms", "first_render_ms", "rerun_ms")}
+        errors = {e for r in runs for e in r["errors"]}
+        print(f"{page:<10} {med['import_ms']:>10.0f} {med['first_render_ms']:>16.0f} {med['rerun_ms']:>9.0f}  "
+              f"{', '.join(runs[-1]['heavy']) or '-'}" + (f"  ERRORS: {errors}" if errors else ""))
+
+if __name__ == "__main__":
+    main()
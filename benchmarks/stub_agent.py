@@ -0,0 +1,88 @@
+# benchmarks/stub_agent.py — Local stand-in for the lesson agent that serves canned lessons, optionally streamed
+#
+#   python -m benchmarks.stub_agent --courses Courses [--port 8765] [--delay 0.3]
+#
+# Point AGENT_URL at http://127.0.0.1:8765/generate_lesson. The reply is the lesson stored at
+# (course_key, section_key, lesson_key) or the first lesson in the tree, re-keyed to the request.
+# NDJSON is streamed when the request accepts it, one event every `--delay` seconds.
+# Lesson keys starting with "bad" stream a malformed quiz; "fail" keys answer ok=false.
+import argparse, copy, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from core.streaming import lesson_events
+
+def make_handler(courses: Path, delay: float):
+    fallback = next(iter(sorted(Path(courses).glob("*/*/*.json"))), None)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args): pass
+
+        def handle(self):
+            try: super().handle()
+            except ConnectionResetError: pass  # client dropped the keep-alive connection, e.g. after aborting a stream
+
+        def _lesson(self, req: Dict[str, Any]) -> Dict[str, Any]:
+            keys = (str(req.get("course_key", "")), str(req.get("section_key", "")), str(req.get("lesson_key", "")))
+            path = Path(courses)/keys[0]/keys[1]/f"{keys[2]}.json"
+            src = path if path.is_file() else fallback
+            data = json.loads(src.read_text(encoding="utf-8")) if src else {"version": "1.0", "overview": {}, "content": {}}
+            data = copy.deepcopy(data)
+            data["metadata"] = dict(data.get("metadata") or {}, course_key=keys[0], section_key=keys[1], lesson_key=keys[2])
+            if keys[2].startswith("bad"):
+                data.setdefault("quizzes", []).insert(0, {"id": "bad", "q": "Malformed quiz", "choices": ["only one"], "answer_index": 3})
+            return data
+
+        def _send(self, status: int, body: bytes, ctype: str):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if str(req.get("lesson_key", "")).startswith("fail"):
+                return self._send(200, json.dumps({"ok": False, "error": "stub failure"}).encode(), "application/json")
+            data = self._lesson(req)
+            if "ndjson" not in self.headers.get("Accept", ""):
+                time.sleep(delay)
+                return self._send(200, json.dumps({"ok": True, "data": data}).encode(), "application/json")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for event in lesson_events(data):
+                    time.sleep(delay)
+                    line = (json.dumps(event) + "\n").encode()
+                    self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # client aborted the stream
+
+    return Handler
+
+def serve(courses: Path, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub on a daemon thread; returns (server, generate URL)."""
+    server = ThreadingHTTPServer((host, port), make_handler(courses, delay))
+    threading.Thread(target=server.serve_forever, name="stub-agent", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/generate_lesson"
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.stub_agent", description="Serve canned lessons as a fake lesson agent")
+    ap.add_argument("--courses", default="Courses", type=Path)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--delay", type=float, default=0.3, help="seconds between streamed events")
+    args = ap.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.courses, args.delay))
+    print(f"stub agent on http://{args.host}:{server.server_port}/generate_lesson", flush=True)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
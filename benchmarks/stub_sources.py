@@ -0,0 +1,71 @@
+# benchmarks/stub_sources.py — Local web server for lesson source pages, with ETag/Last-Modified revalidation
+#
+#   python -m benchmarks.stub_sources --root pages_dir [--port 8766]
+#
+# Serves the files under `--root` at `/<relative path>` as HTML. Every response carries an ETag
+# (content hash) and Last-Modified (file mtime); If-None-Match / If-Modified-Since get a 304.
+# `--no-validators` drops both headers, for sources that always answer 200.
+import argparse, hashlib, threading
+from collections import Counter
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Tuple
+
+def make_handler(root: Path, validators: bool = True, counts: Counter = None):
+    root = Path(root).resolve()
+    counts = counts if counts is not None else Counter()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args): pass
+
+        def _send(self, status: int, body: bytes = b"", headers: dict = None):
+            counts[status] += 1
+            self.send_response(status)
+            for k, v in (headers or {}).items(): self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body: self.wfile.write(body)
+
+        def do_GET(self):
+            path = (root/self.path.split("?", 1)[0].lstrip("/")).resolve()
+            if root not in path.parents or not path.is_file(): return self._send(404)
+            body = path.read_bytes()
+            headers = {"Content-Type": "text/html; charset=utf-8"}
+            if validators:
+                mtime = int(path.stat().st_mtime)
+                headers.update(ETag=f'"{hashlib.sha256(body).hexdigest()[:20]}"', **{"Last-Modified": formatdate(mtime, usegmt=True)})
+                if_none, if_since = self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")
+                if if_none is not None:
+                    if headers["ETag"] in [t.strip() for t in if_none.split(",")]: return self._send(304, headers=headers)
+                elif if_since:
+                    try:
+                        if mtime <= parsedate_to_datetime(if_since).timestamp(): return self._send(304, headers=headers)
+                    except (TypeError, ValueError): pass
+            self._send(200, body, headers)
+
+    return Handler
+
+def serve(root: Path, host: str = "127.0.0.1", port: int = 0, validators: bool = True) -> Tuple[ThreadingHTTPServer, str, Counter]:
+    """Start the server on a daemon thread; returns (server, base URL, responses per status)."""
+    counts = Counter()
+    server = ThreadingHTTPServer((host, port), make_handler(root, validators, counts))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-sources", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}", counts
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.stub_sources", description="Serve source pages with conditional GET support")
+    ap.add_argument("--root", required=True, type=Path)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--no-validators", action="store_true", help="send no ETag/Last-Modified (always 200)")
+    args = ap.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.root, not args.no_validators))
+    print(f"stub sources on http://{args.host}:{server.server_port}/ from {args.root}", flush=True)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
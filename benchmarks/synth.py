@@ -0,0 +1,51 @@
+# benchmarks/synth.py — Synthetic, schema-valid lessons and course trees for benchmarks
+import itertools, json, random
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+WORDS = ("token attention transformer embedding gradient reward policy agent context protocol model "
+         "prompt memory retrieval vector loss layer batch sampling decoding inference tool planner "
+         "value function environment episode server client schema message stream cache").split()
+
+# Real text is Zipf-distributed: a few common domain words plus a long tail of rare terms.
+_SYLLABLES = ["".join(p) for p in itertools.product("bdgklmnprstvz", "aeiou")]
+_TAIL = ["".join(random.Random(i).sample(_SYLLABLES, 3)) for i in range(20_000)]
+VOCAB = WORDS + _TAIL
+_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCAB))))
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choices(VOCAB, cum_weights=_WEIGHTS, k=n)).capitalize() + "."
+
+def make_lesson(course: str, section: str, lesson: str, rng: random.Random,
+                sections: int = 3, quizzes: int = 3, flashcards: int = 3, body_words: int = 120) -> Dict[str, Any]:
+    return {
+        "version": "1.0",
+        "metadata": {"course_key": course, "section_key": section, "lesson_key": lesson,
+                     "source_url": "", "last_updated": "2025-09-07T10:00:00Z"},
+        "overview": {"title": _text(rng, 4)[:-1], "subtitle": _text(rng, 6), "difficulty": "beginner",
+                     "duration_minutes": 15},
+        "content": {"format": "markdown", "sections": [
+            {"id": f"s{i}", "title": _text(rng, 3)[:-1], "body": _text(rng, body_words)} for i in range(sections)]},
+        "flashcards": [{"id": f"fc{i}", "q": _text(rng, 6), "a": _text(rng, 4), "xp": 2} for i in range(flashcards)],
+        "quizzes": [{"id": f"q{i}", "q": _text(rng, 8), "choices": [_text(rng, 3) for _ in range(4)],
+                     "answer_index": rng.randrange(4), "explain": _text(rng, 10), "xp_correct": 5, "xp_incorrect": 0}
+                    for i in range(quizzes)],
+    }
+
+def iter_lessons(courses: int, sections: int, lessons: int, seed: int = 0) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    for c in range(courses):
+        for s in range(sections):
+            for l in range(lessons):
+                course, section, lesson = f"course_{c:03d}", f"{s + 1}.unit_{s + 1:03d}", f"{l + 1:04d}.lesson"
+                yield course, section, lesson, make_lesson(course, section, lesson, rng)
+
+def write_tree(root: Path, courses: int, sections: int, lessons: int, seed: int = 0) -> int:
+    """Write `courses * sections * lessons` lesson files under `root`; returns the count."""
+    n = 0
+    for course, section, lesson, data in iter_lessons(courses, sections, lessons, seed):
+        path = Path(root)/course/section/f"{lesson}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        n += 1
+    return n
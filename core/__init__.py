@@ -0,0 +1 @@
+# core — shared, Streamlit-free helpers used by app.py and the pages
@@ -0,0 +1,128 @@
+# core/agent_client.py — Pooled keep-alive client for the lesson agent with an on-disk response cache
+import hashlib, json, os, threading, time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.streaming import apply_event, lesson_events
+
+def payload_key(payload: Dict[str, Any]) -> str:
+    """Content address of a generation request: whitespace/case-insensitive where it doesn't matter."""
+    norm = json.loads(json.dumps(payload))
+    src = norm.get("source") or {}
+    if isinstance(src.get("value"), str): src["value"] = src["value"].strip()
+    if isinstance(src.get("type"), str): src["type"] = src["type"].lower()
+    opts = norm.get("options") or {}
+    if isinstance(opts.get("difficulty"), str): opts["difficulty"] = opts["difficulty"].lower()
+    return hashlib.sha256(json.dumps(norm, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """Successful agent responses stored as `<dir>/<key[:2]>/<key>.json`, expired by TTL, trimmed oldest-first."""
+
+    def __init__(self, root: Path, ttl_seconds: float = 7 * 86400, max_bytes: int = 256 << 20):
+        self.root, self.ttl, self.max_bytes = Path(root), ttl_seconds, max_bytes
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root/key[:2]/f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                raise FileNotFoundError
+            with path.open(encoding="utf-8") as f: res = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return res
+
+    def put(self, key: str, res: Dict[str, Any]):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f: json.dump(res, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        self._trim()
+
+    def _trim(self):
+        with self._lock:
+            files = []
+            for p in self.root.glob("*/*.json"):
+                try: st = p.stat()
+                except OSError: continue
+                files.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in files)
+            now = time.time()
+            for mtime, size, p in sorted(files):
+                if total <= self.max_bytes and now - mtime <= self.ttl: break
+                p.unlink(missing_ok=True)
+                total -= size
+
+class AgentClient:
+    """One keep-alive `requests.Session` shared by every session and worker thread."""
+
+    def __init__(self, url: str, timeout: float = 90, pool_size: int = 8, cache: Optional[ResponseCache] = None):
+        self.url, self.timeout, self.cache = url, timeout, cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests_sent = 0
+
+    def generate(self, payload: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        key = payload_key(payload) if self.cache else None
+        if key and use_cache:
+            hit = self.cache.get(key)
+            if hit is not None: return hit
+        self.requests_sent += 1
+        r = self.session.post(self.url, json=payload, timeout=self.timeout)
+        r.raise_for_status()
+        res = r.json()
+        if key and res.get("ok"): self.cache.put(key, res)
+        return res
+
+    def stream(self, payload: Dict[str, Any], use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """Yield lesson events (see core.streaming) as the agent produces them.
+
+        Agents that answer with plain JSON, and cache hits, are replayed as events. Closing
+        the generator early closes the connection, which aborts the generation upstream.
+        """
+        key = payload_key(payload) if self.cache else None
+        if key and use_cache:
+            hit = self.cache.get(key)
+            if hit is not None and hit.get("ok"):
+                yield from lesson_events(hit["data"])
+                return
+        self.requests_sent += 1
+        with self.session.post(self.url, json=payload, timeout=self.timeout, stream=True,
+                               headers={"Accept": "application/x-ndjson, application/json"}) as r:
+            r.raise_for_status()
+            if "ndjson" not in r.headers.get("Content-Type", ""):
+                res = r.json()
+                if not res.get("ok"):
+                    yield {"event": "error", "error": res.get("error") or json.dumps(res)}
+                    return
+                if key: self.cache.put(key, res)
+                yield from lesson_events(res["data"])
+                return
+            lesson: Dict[str, Any] = {}
+            for line in r.iter_lines():
+                if not line.strip(): continue
+                event = json.loads(line)
+                yield event
+                if event.get("event") == "error": return
+                apply_event(lesson, event)
+                if event.get("event") == "done":
+                    if key: self.cache.put(key, {"ok": True, "data": lesson})
+                    return
+
+    def stats(self) -> Dict[str, int]:
+        out = {"requests_sent": self.requests_sent}
+        if self.cache: out.update(cache_hits=self.cache.hits, cache_misses=self.cache.misses)
+        return out
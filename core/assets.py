@@ -0,0 +1,43 @@
+# core/assets.py — Stylesheet loaded and minified once per process, hot-reloaded on mtime change
+import re, threading, time
+from pathlib import Path
+from typing import Optional
+
+def minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+class Stylesheet:
+    """Minified copy of a CSS file, shared by every session.
+
+    The source mtime is checked at most every `check_interval` seconds and the file is
+    only re-read and re-minified when it moved, so style edits still hot-reload.
+    """
+
+    def __init__(self, source: Path, check_interval: float = 1.0):
+        self.source, self.check_interval = Path(source), check_interval
+        self._lock = threading.Lock()
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = float("-inf")
+        self.css = ""
+        self._html = "<style></style>"
+        self.reloads = 0
+
+    def _refresh(self):
+        if time.monotonic() - self._checked_at < self.check_interval: return
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try: mtime = self.source.stat().st_mtime_ns
+            except OSError: return
+            if mtime == self._mtime_ns: return
+            self.css = minify_css(self.source.read_text(encoding="utf-8"))
+            self._html = f"<style>{self.css}</style>"
+            self._mtime_ns = mtime
+            self.reloads += 1
+
+    def html(self) -> str:
+        self._refresh()
+        return self._html
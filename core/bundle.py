@@ -0,0 +1,118 @@
+# core/bundle.py — Single-file, indexed lesson bundle read through mmap
+#
+# Layout: header | lesson records | index
+#   header  = MAGIC, format version (u16), reserved (u16), index offset (u64), index length (u64)
+#   record  = compact UTF-8 JSON of one lesson
+#   index   = compact JSON list of [course, section, lesson, offset, length, title]
+#
+# Build:  python -m core.bundle compile --courses Courses --out courses.bundle
+import argparse, json, mmap, os, struct, sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"AILB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+
+class BundleError(Exception):
+    pass
+
+def _title(data: Dict[str, Any], lesson: str) -> str:
+    title = (data.get("overview") or {}).get("title") if isinstance(data, dict) else None
+    return title if isinstance(title, str) and title else lesson.replace('_', ' ').title()
+
+def compile_courses(root: Path, out: Path) -> int:
+    """Pack every `<root>/<course>/<section>/<lesson>.json` into `out`; returns the lesson count."""
+    root, out = Path(root), Path(out)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    index: List[list] = []
+    with tmp.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        for path in sorted(root.glob("*/*/*.json")):
+            course, section, lesson = path.parent.parent.name, path.parent.name, path.stem
+            with path.open(encoding="utf-8") as src: data = json.load(src)
+            blob = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            index.append([course, section, lesson, f.tell(), len(blob), _title(data, lesson)])
+            f.write(blob)
+        index_offset = f.tell()
+        blob = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        f.write(blob)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(blob)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, out)
+    return len(index)
+
+class LessonBundle:
+    """Memory-mapped bundle; answers the same listing queries as CourseCatalog and decodes lessons on access."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, index_offset, index_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION: raise BundleError(f"{path}: not a v{VERSION} lesson bundle")
+        self.mtime_ns = os.fstat(self._file.fileno()).st_mtime_ns
+        self._tree: Dict[str, Dict[str, Dict[str, Tuple[int, int, str]]]] = {}
+        for course, section, lesson, offset, length, title in json.loads(self._mm[index_offset:index_offset + index_len]):
+            self._tree.setdefault(course, {}).setdefault(section, {})[lesson] = (offset, length, title)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def locate(self, course: str, section: str, lesson: str) -> Optional[Tuple[int, int, str]]:
+        return self._tree.get(course, {}).get(section, {}).get(lesson)
+
+    def load(self, course: str, section: str, lesson: str) -> Optional[Dict[str, Any]]:
+        hit = self.locate(course, section, lesson)
+        if not hit: return None
+        offset, length, _ = hit
+        return json.loads(self._mm[offset:offset + length])
+
+    # ---------- CourseCatalog-compatible queries ----------
+    def refresh(self, force: bool = False): pass
+    def apply_changes(self, changes): pass
+
+    def courses(self) -> List[str]:
+        return sorted(self._tree)
+
+    def sections(self, course: str) -> List[str]:
+        return sorted(self._tree.get(course, {}))
+
+    def lessons(self, course: str, section: str) -> List[str]:
+        return sorted(self._tree.get(course, {}).get(section, {}))
+
+    def lesson_count(self, course: str, section: Optional[str] = None) -> int:
+        secs = self._tree.get(course, {})
+        if section is not None: return len(secs.get(section, {}))
+        return sum(len(lessons) for lessons in secs.values())
+
+    @property
+    def version(self) -> int:
+        return self.mtime_ns
+
+    def all_lessons(self) -> Iterator[Tuple[str, str, str]]:
+        for course, sections in self._tree.items():
+            for section, lessons in sections.items():
+                for lesson in lessons: yield course, section, lesson
+
+    def title(self, course: str, section: str, lesson: str) -> str:
+        hit = self.locate(course, section, lesson)
+        return hit[2] if hit else lesson.replace('_', ' ').title()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m core.bundle", description="Compile the course tree into a lesson bundle")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("compile", help="pack COURSES_DIR into a single bundle file")
+    c.add_argument("--courses", default="Courses", type=Path)
+    c.add_argument("--out", default="courses.bundle", type=Path)
+    args = ap.parse_args(argv)
+    if args.cmd == "compile":
+        n = compile_courses(args.courses, args.out)
+        print(f"Packed {n} lessons into {args.out} ({args.out.stat().st_size} bytes)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
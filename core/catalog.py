@@ -0,0 +1,186 @@
+# core/catalog.py — Process-wide course → section → lesson index with mtime-based refresh
+import json, os, threading, time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+@dataclass
+class LessonEntry:
+    key: str
+    title: str
+    mtime_ns: int
+
+@dataclass
+class SectionEntry:
+    key: str
+    mtime_ns: int = -1
+    lessons: Dict[str, LessonEntry] = field(default_factory=dict)
+
+@dataclass
+class CourseEntry:
+    key: str
+    mtime_ns: int = -1
+    sections: Dict[str, SectionEntry] = field(default_factory=dict)
+
+def _mtime_ns(p: Path) -> Optional[int]:
+    try: return p.stat().st_mtime_ns
+    except OSError: return None
+
+def _subdirs(p: Path) -> List[str]:
+    with os.scandir(p) as it:
+        return sorted(e.name for e in it if e.is_dir())
+
+def fallback_title(lesson_key: str) -> str:
+    return lesson_key.replace('_', ' ').title()
+
+def _read_title(path: Path, lesson_key: str) -> str:
+    try:
+        with path.open(encoding="utf-8") as f: data = json.load(f)
+        title = (data.get("overview") or {}).get("title")
+        return title if isinstance(title, str) and title else fallback_title(lesson_key)
+    except (OSError, ValueError, AttributeError):
+        return fallback_title(lesson_key)
+
+class CourseCatalog:
+    """In-memory index of COURSES_DIR shared by every session.
+
+    Directory mtimes are re-checked at most once per `refresh_interval` seconds and
+    only the levels whose mtime moved are rescanned. Writes made through the change
+    journal arrive via `apply_changes` and need no rescan; the mtime checks catch
+    edits made outside the app.
+    """
+
+    def __init__(self, root: Path, refresh_interval: float = 2.0):
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._courses: Dict[str, CourseEntry] = {}
+        self._root_mtime: Optional[int] = None
+        self._checked_at = float("-inf")
+        self.scans = 0
+        self.fs_calls = {"stat": 0, "listdir": 0, "read": 0}  # filesystem work done by scans and journal updates
+        self.revision = 0  # lessons added/removed via apply_changes
+        self.refresh(force=True)
+
+    # ---------- Filesystem (counted) ----------
+    def _mtime_ns(self, p: Path) -> Optional[int]:
+        self.fs_calls["stat"] += 1
+        return _mtime_ns(p)
+
+    def _subdirs(self, p: Path) -> List[str]:
+        self.fs_calls["listdir"] += 1
+        return _subdirs(p)
+
+    def _lesson_files(self, p: Path) -> List[Path]:
+        self.fs_calls["listdir"] += 1
+        return sorted(p.glob("*.json"))
+
+    def _read_title(self, path: Path, lesson_key: str) -> str:
+        self.fs_calls["read"] += 1
+        return _read_title(path, lesson_key)
+
+    # ---------- Refresh ----------
+    def refresh(self, force: bool = False):
+        if not force and time.monotonic() - self._checked_at < self.refresh_interval: return
+        with self._lock:
+            self._checked_at = time.monotonic()
+            root_mtime = self._mtime_ns(self.root)
+            if root_mtime is None:
+                if self._courses: self.scans += 1
+                self._courses, self._root_mtime = {}, None
+                return
+            courses = self._courses
+            if root_mtime != self._root_mtime:
+                self.scans += 1
+                courses = {k: courses.get(k) or CourseEntry(k) for k in self._subdirs(self.root)}
+                self._root_mtime = root_mtime
+            for course in courses.values():
+                self._refresh_course(course)
+            self._courses = courses
+
+    def _refresh_course(self, course: CourseEntry):
+        path = self.root/course.key
+        mtime = self._mtime_ns(path)
+        if mtime is None: return
+        if mtime != course.mtime_ns:
+            self.scans += 1
+            course.sections = {k: course.sections.get(k) or SectionEntry(k) for k in self._subdirs(path)}
+            course.mtime_ns = mtime
+        for section in course.sections.values():
+            self._refresh_section(path/section.key, section)
+
+    def _refresh_section(self, path: Path, section: SectionEntry):
+        mtime = self._mtime_ns(path)
+        if mtime is None or mtime == section.mtime_ns: return
+        self.scans += 1
+        lessons: Dict[str, LessonEntry] = {}
+        for f in self._lesson_files(path):
+            f_mtime = self._mtime_ns(f)
+            if f_mtime is None: continue
+            old = section.lessons.get(f.stem)
+            if old and old.mtime_ns == f_mtime: lessons[f.stem] = old
+            else: lessons[f.stem] = LessonEntry(f.stem, self._read_title(f, f.stem), f_mtime)
+        section.lessons = lessons
+        section.mtime_ns = mtime
+
+    def apply_changes(self, changes):
+        """ChangeJournal follower: fold lesson writes in without rescanning their sections."""
+        with self._lock:
+            for change in changes:
+                key = change.lesson_key()
+                course = self._courses.get(key[0]) if key else None
+                section = course.sections.get(key[1]) if course else None
+                if section is None:  # new course or section: the next scan lists it
+                    self._checked_at = float("-inf")
+                    continue
+                path = self.root/change.path
+                mtime = self._mtime_ns(path)
+                if mtime is None:
+                    if section.lessons.pop(key[2], None): self.revision += 1
+                    continue
+                if key[2] not in section.lessons: self.revision += 1
+                section.lessons[key[2]] = LessonEntry(key[2], self._read_title(path, key[2]), mtime)
+                section.lessons = dict(sorted(section.lessons.items()))
+                # The rename moved the section dir's mtime; the journal already told us what changed
+                section.mtime_ns = self._mtime_ns(path.parent) or section.mtime_ns
+
+    # ---------- Queries ----------
+    def courses(self) -> List[str]:
+        self.refresh()
+        return list(self._courses)
+
+    def sections(self, course: str) -> List[str]:
+        self.refresh()
+        entry = self._courses.get(course)
+        return list(entry.sections) if entry else []
+
+    def lessons(self, course: str, section: str) -> List[str]:
+        self.refresh()
+        entry = self._courses.get(course)
+        sec = entry.sections.get(section) if entry else None
+        return list(sec.lessons) if sec else []
+
+    def lesson_count(self, course: str, section: Optional[str] = None) -> int:
+        self.refresh()
+        entry = self._courses.get(course)
+        if not entry: return 0
+        if section is not None:
+            sec = entry.sections.get(section)
+            return len(sec.lessons) if sec else 0
+        return sum(len(s.lessons) for s in entry.sections.values())
+
+    @property
+    def version(self) -> int:
+        """Changes whenever any level was rescanned or the journal added/removed a lesson."""
+        return self.scans + self.revision
+
+    def all_lessons(self) -> Iterator[Tuple[str, str, str]]:
+        for course in list(self._courses.values()):
+            for section in list(course.sections.values()):
+                for lesson in list(section.lessons): yield course.key, section.key, lesson
+
+    def title(self, course: str, section: str, lesson: str) -> str:
+        entry = self._courses.get(course)
+        sec = entry.sections.get(section) if entry else None
+        hit = sec.lessons.get(lesson) if sec else None
+        return hit.title if hit else fallback_title(lesson)
@@ -0,0 +1,150 @@
+# core/generation.py — Bounded-concurrency batch lesson generation with retries
+import csv, io, json, random, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+JOB_FIELDS = ["course_key", "section_key", "lesson_key", "source_type", "source", "difficulty", "duration"]
+FINISHED = ("saved", "invalid", "failed")
+
+def build_payload(course_key: str, section_key: str, lesson_key: str, src_type: str, src_value: str,
+                  difficulty: str = "beginner", duration: int = 20) -> Dict[str, Any]:
+    return {
+        "course_key": course_key,
+        "section_key": section_key,
+        "lesson_key": lesson_key,
+        "source": {"type": src_type, "value": src_value},
+        "options": {"difficulty": difficulty, "duration_hint": duration}
+    }
+
+class AgentFailure(Exception):
+    """The agent answered but reported ok=false."""
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)): return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return False
+
+@dataclass
+class GenerationJob:
+    course_key: str
+    section_key: str
+    lesson_key: str
+    source_type: str
+    source: str
+    difficulty: str = "beginner"
+    duration: int = 20
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    batch: str = ""
+    status: str = "queued"  # queued | running | retrying | saved | invalid | failed
+    attempts: int = 0
+    error: str = ""
+    saved_to: str = ""
+    updated: float = field(default_factory=time.time)
+
+    def payload(self) -> Dict[str, Any]:
+        return build_payload(self.course_key, self.section_key, self.lesson_key,
+                             self.source_type, self.source, self.difficulty, int(self.duration))
+
+def parse_jobs(text: str, fmt: str) -> List[GenerationJob]:
+    """Parse a CSV (with header) or JSONL upload into jobs; raises ValueError on bad rows."""
+    rows = list(csv.DictReader(io.StringIO(text))) if fmt == "csv" else \
+        [json.loads(line) for line in text.splitlines() if line.strip()]
+    jobs = []
+    for n, row in enumerate(rows, start=1):
+        row = {k.strip(): v.strip() if isinstance(v, str) else v for k, v in row.items() if k}
+        missing = [k for k in ("course_key", "section_key", "lesson_key", "source") if not row.get(k)]
+        if missing: raise ValueError(f"row {n}: missing {', '.join(missing)}")
+        jobs.append(GenerationJob(
+            course_key=row["course_key"], section_key=row["section_key"], lesson_key=row["lesson_key"],
+            source_type=row.get("source_type") or "url", source=row["source"],
+            difficulty=row.get("difficulty") or "beginner", duration=int(row.get("duration") or 20)))
+    return jobs
+
+class GenerationQueue:
+    """Runs generation jobs on a shared thread pool, off the Streamlit script thread.
+
+    `generate(payload) -> dict` calls the agent, `validate(data)` raises on schema errors and
+    `save(job, data) -> path` persists the lesson. Transport errors and 429/5xx responses are
+    retried with exponential backoff and jitter; validation and agent failures are not.
+    `on_finish(job)` runs on the worker for every job that ends saved, invalid or failed,
+    before `finished()` reports it, so callers polling the queue see its effects.
+    Only the newest `keep_batches` finished batches are remembered; older ones are dropped
+    on the next submit, so a long-running server does not accumulate every job it ran.
+    """
+
+    def __init__(self, generate: Callable[[Dict[str, Any]], Dict[str, Any]], validate: Callable[[Dict[str, Any]], Any],
+                 save: Callable[[GenerationJob, Dict[str, Any]], Any], max_workers: int = 4,
+                 max_retries: int = 3, backoff: float = 2.0, keep_batches: int = 20,
+                 on_finish: Optional[Callable[[GenerationJob], Any]] = None):
+        self.generate, self.validate, self.save, self.on_finish = generate, validate, save, on_finish
+        self.max_retries, self.backoff, self.keep_batches = max_retries, backoff, keep_batches
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lesson-gen")
+        self._lock = threading.Lock()
+        self._batches: Dict[str, List[GenerationJob]] = {}  # in submission order
+
+    def submit(self, jobs: List[GenerationJob]) -> str:
+        batch = uuid.uuid4().hex[:8]
+        with self._lock:
+            for job in jobs: job.batch = batch
+            self._batches[batch] = list(jobs)
+            self._prune()
+        for job in jobs: self._pool.submit(self._run, job)
+        return batch
+
+    def _prune(self):
+        done = [b for b, jobs in self._batches.items() if all(j.status in FINISHED for j in jobs)]
+        for batch in done[:max(0, len(done) - self.keep_batches)]: del self._batches[batch]
+
+    def jobs(self, batch: Optional[str] = None) -> List[GenerationJob]:
+        """Jobs of one batch (empty once it has been pruned), or of every remembered batch."""
+        with self._lock:
+            if batch is not None: return list(self._batches.get(batch, ()))
+            return [j for jobs in self._batches.values() for j in jobs]
+
+    def finished(self, batch: str) -> bool:
+        return all(j.status in FINISHED for j in self.jobs(batch))
+
+    def rows(self, batch: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [asdict(j) for j in self.jobs(batch)]
+
+    def _set(self, job: GenerationJob, **changes):
+        with self._lock:
+            for k, v in changes.items(): setattr(job, k, v)
+            job.updated = time.time()
+
+    def _finish(self, job: GenerationJob, **changes):
+        if self.on_finish:
+            try: self.on_finish(replace(job, **changes))
+            except Exception as e: changes["error"] = f"{changes.get('error', '')} (on_finish failed: {e})".strip()
+        self._set(job, **changes)
+
+    def _run(self, job: GenerationJob):
+        while True:
+            self._set(job, status="running", attempts=job.attempts + 1)
+            try:
+                res = self.generate(job.payload())
+                if not res.get("ok"): raise AgentFailure(json.dumps(res)[:500])
+                data = res["data"]
+            except Exception as e:
+                if is_retryable(e) and job.attempts <= self.max_retries:
+                    self._set(job, status="retrying", error=str(e))
+                    time.sleep(self.backoff ** job.attempts * (0.5 + random.random()))
+                    continue
+                self._finish(job, status="failed", error=str(e))
+                return
+            try:
+                self.validate(data)
+            except Exception as e:
+                self._finish(job, status="invalid", error=str(e)[:500])
+                return
+            try:
+                path = self.save(job, data)
+            except Exception as e:  # anything escaping here would leave the job "running" forever
+                self._finish(job, status="failed", error=f"save failed: {e}")
+                return
+            self._finish(job, status="saved", error="", saved_to=str(path))
+            return
@@ -0,0 +1,146 @@
+# core/journal.py — Atomic lesson writes and the append-only change journal that records them
+import hashlib, json, os, threading, time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+@dataclass(frozen=True)
+class Change:
+    seq: int       # position in the journal, counted by each reader
+    path: str      # "/"-separated, relative to the journal root
+    sha256: str
+    size: int
+    ts: float
+
+    def lesson_key(self) -> Optional[Tuple[str, str, str]]:
+        """(course, section, lesson) for `<course>/<section>/<lesson>.json`, else None."""
+        parts = self.path.split("/")
+        if len(parts) != 3 or not parts[2].endswith(".json"): return None
+        return parts[0], parts[1], parts[2][:-5]
+
+def _fsync_dir(path: Path):
+    try: fd = os.open(path, os.O_RDONLY)
+    except OSError: return
+    try: os.fsync(fd)
+    except OSError: pass
+    finally: os.close(fd)
+
+def atomic_write(path: Path, blob: bytes):
+    """Replace `path` with `blob`: temp file beside it, fsync, rename, fsync the directory.
+
+    Readers see the old file or the new one, never a partial write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+class ChangeJournal:
+    """JSON-lines log of every lesson written under `root`, shared by sessions and processes.
+
+    `write_json` holds a per-lesson lock across the atomic write and the journal append,
+    so two authors saving the same lesson serialize and the journal order matches the
+    order the files landed in. Consumers register with `follow(name, apply)` and each
+    `poll` hands them the entries they haven't seen yet; it costs one stat while nothing
+    changed. The file rotates to `<path>.1` past `max_bytes`; a reader that misses the
+    tail of a rotated file falls back to its own filesystem checks (catalog mtimes,
+    cache signatures).
+    """
+
+    def __init__(self, path: Path, root: Path, max_bytes: int = 4 << 20):
+        self.path, self.root, self.max_bytes = Path(path), Path(root), max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._root = self.root.resolve()
+        self._lock = threading.RLock()
+        self._append_lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._entries: List[Change] = []  # unconsumed tail; _entries[0].seq == _base
+        self._base = self._seq = 0
+        self._inode, self._offset, self._partial = None, 0, b""
+        self._followers: Dict[str, list] = {}  # name -> [apply, next seq]
+        self._read_new()
+        self._entries.clear()  # history before startup is already on disk
+        self._base = self._seq
+
+    # ---------- Writes ----------
+    def lock(self, path: Path) -> threading.Lock:
+        key = str(Path(path).resolve())
+        with self._lock: return self._locks.setdefault(key, threading.Lock())
+
+    def write_json(self, path: Path, data: dict) -> str:
+        """Atomically write `data` as the lesson at `path` and journal it; returns the content hash."""
+        blob = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        digest = hashlib.sha256(blob).hexdigest()
+        with self.lock(path):
+            atomic_write(path, blob)
+            self.record(path, digest, len(blob))
+        return digest
+
+    def record(self, path: Path, sha256: str, size: int):
+        try: rel = Path(path).resolve().relative_to(self._root).as_posix()
+        except ValueError: return  # outside the course tree: nothing follows it
+        line = json.dumps({"path": rel, "sha256": sha256, "size": size, "ts": time.time()}) + "\n"
+        with self._append_lock:
+            try:
+                if self.path.stat().st_size > self.max_bytes: os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            except OSError: pass
+            # One O_APPEND write per entry, so lines from concurrent processes never interleave
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try: os.write(fd, line.encode("utf-8"))
+            finally: os.close(fd)
+
+    # ---------- Reads ----------
+    def _read_new(self):
+        try: st = self.path.stat()
+        except OSError: return
+        if st.st_ino != self._inode or st.st_size < self._offset:  # first read, or rotated
+            self._inode, self._offset, self._partial = st.st_ino, 0, b""
+        if st.st_size == self._offset: return
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        self._offset += len(chunk)
+        *lines, self._partial = (self._partial + chunk).split(b"\n")
+        for line in lines:
+            try: raw = json.loads(line)
+            except ValueError: continue
+            self._entries.append(Change(self._seq, raw["path"], raw["sha256"], raw["size"], raw["ts"]))
+            self._seq += 1
+
+    def follow(self, name: str, apply: Callable[[List[Change]], None]):
+        """Register (or re-register) a consumer; a new one starts at the current head."""
+        with self._lock:
+            follower = self._followers.get(name)
+            if follower: follower[0] = apply
+            else: self._followers[name] = [apply, self._seq]
+
+    def poll(self):
+        """Read new journal lines and hand each follower the changes past its cursor."""
+        with self._lock:
+            self._read_new()
+            for follower in self._followers.values():
+                apply, cursor = follower
+                pending = self._entries[max(0, cursor - self._base):]
+                if not pending: continue
+                follower[1] = self._seq
+                apply(pending)
+            low = min((f[1] for f in self._followers.values()), default=self._seq)
+            del self._entries[:low - self._base]
+            self._base = low
+
+    @property
+    def head(self) -> int:
+        return self._seq
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"head": self._seq, "buffered": len(self._entries), "followers": len(self._followers)}
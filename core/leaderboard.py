@@ -0,0 +1,226 @@
+# core/leaderboard.py — Global, per-course and weekly XP boards with O(log n) rank, top-K and neighbor queries
+import datetime as dt
+import itertools, threading, time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Entry = Tuple[int, str, int]  # (rank, user_id, xp), rank counted from 1
+
+class RankedList:
+    """Sorted unique keys with positional access.
+
+    Keys are kept in runs of at most 2*`load` elements, with a Fenwick tree over the run
+    lengths: finding a key's position, the key at a position, inserting and removing are a
+    bisect over the run maxima, a bisect (and a bounded memmove) inside one run and an
+    O(log runs) tree walk. The tree is rebuilt only when a run splits or empties.
+    """
+
+    def __init__(self, load: int = 512):
+        self.load = load
+        self._runs: List[list] = []
+        self._maxes: list = []
+        self._tree: List[int] = [0]  # 1-based Fenwick tree over len(run)
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _rebuild(self):
+        tree = [0] + [len(r) for r in self._runs]
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree): tree[j] += tree[i]
+        self._tree = tree
+
+    def _bump(self, run: int, delta: int):
+        i = run + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, run: int) -> int:
+        """Number of keys in runs[:run]."""
+        total = 0
+        while run:
+            total += self._tree[run]
+            run -= run & -run
+        return total
+
+    def _locate(self, pos: int) -> Tuple[int, int]:
+        """(run, offset) of the key at 0-based `pos`."""
+        run, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = run + step
+            if nxt < len(self._tree) and self._tree[nxt] <= pos:
+                run, pos = nxt, pos - self._tree[nxt]
+            step >>= 1
+        return run, pos
+
+    def update(self, keys: Iterable):
+        """Add many keys at once: one sort, then the runs are cut from the result."""
+        merged = sorted(itertools.chain(itertools.chain.from_iterable(self._runs), keys))
+        self._runs = [merged[i:i + self.load] for i in range(0, len(merged), self.load)]
+        self._maxes = [run[-1] for run in self._runs]
+        self._len = len(merged)
+        self._rebuild()
+
+    def add(self, key):
+        if not self._runs:
+            self._runs, self._maxes = [[key]], [key]
+            self._rebuild()
+        else:
+            i = min(bisect_left(self._maxes, key), len(self._runs) - 1)
+            run = self._runs[i]
+            insort(run, key)
+            self._maxes[i] = run[-1]
+            if len(run) > 2 * self.load:
+                self._runs[i:i + 1] = [run[:self.load], run[self.load:]]
+                self._maxes[i:i + 1] = [run[self.load - 1], run[-1]]
+                self._rebuild()
+            else:
+                self._bump(i, 1)
+        self._len += 1
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        run = self._runs[i] if i < len(self._runs) else []
+        j = bisect_left(run, key)
+        if j == len(run) or run[j] != key: raise KeyError(key)
+        del run[j]
+        self._len -= 1
+        if run:
+            self._maxes[i] = run[-1]
+            self._bump(i, -1)
+        else:
+            del self._runs[i], self._maxes[i]
+            self._rebuild()
+
+    def index(self, key) -> int:
+        i = bisect_left(self._maxes, key)
+        run = self._runs[i] if i < len(self._runs) else []
+        j = bisect_left(run, key)
+        if j == len(run) or run[j] != key: raise KeyError(key)
+        return self._before(i) + j
+
+    def slice(self, start: int, stop: int) -> list:
+        """Keys at positions [start, stop)."""
+        start, stop = max(0, start), min(stop, self._len)
+        if start >= stop: return []
+        run, offset = self._locate(start)
+        out = []
+        while len(out) < stop - start:
+            out.extend(self._runs[run][offset:offset + stop - start - len(out)])
+            run, offset = run + 1, 0
+        return out
+
+class Board:
+    """One ranking: XP per user, higher first; ties go to whoever reached the score first."""
+
+    def __init__(self):
+        self._keys = RankedList()
+        self._by_user: Dict[str, tuple] = {}  # user -> its key (-xp, seq, user)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(self, scores: Iterable[Tuple[str, int, int]]):
+        """Bulk `set` of (user, xp, seq) for users not on the board yet."""
+        keys = [(-xp, seq, user) for user, xp, seq in scores]
+        self._by_user.update((key[2], key) for key in keys)
+        self._keys.update(keys)
+
+    def set(self, user: str, xp: int, seq: int):
+        old = self._by_user.get(user)
+        if old: self._keys.remove(old)
+        key = self._by_user[user] = (-xp, seq, user)
+        self._keys.add(key)
+
+    def xp(self, user: str) -> int:
+        key = self._by_user.get(user)
+        return -key[0] if key else 0
+
+    def rank(self, user: str) -> Optional[int]:
+        key = self._by_user.get(user)
+        return self._keys.index(key) + 1 if key else None
+
+    def _entries(self, start: int, stop: int) -> List[Entry]:
+        return [(start + n + 1, user, -neg) for n, (neg, _, user) in enumerate(self._keys.slice(start, stop))]
+
+    def top(self, k: int) -> List[Entry]:
+        return self._entries(0, k)
+
+    def around(self, user: str, k: int) -> List[Entry]:
+        """The user's entry with up to `k` neighbors above and below."""
+        rank = self.rank(user)
+        return self._entries(rank - 1 - k, rank + k) if rank else []
+
+def week_of(ts: float) -> str:
+    year, week, _ = dt.date.fromtimestamp(ts).isocalendar()
+    return f"week:{year}-W{week:02d}"
+
+def week_start(ts: float) -> float:
+    day = dt.date.fromtimestamp(ts)
+    return time.mktime((day - dt.timedelta(days=day.weekday())).timetuple())
+
+class Leaderboard:
+    """XP boards for every learner of the process: "global", "course:<key>" and "week:<year>-W<nn>".
+
+    Filled once from the progress store (`load`) and then kept current by `record` on every
+    XP gain, so reads never touch SQLite. Other processes' gains show up after a restart.
+    Only the current and previous weeks are kept.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards: Dict[str, Board] = {}
+        self._seq = itertools.count()
+
+    def _board(self, name: str) -> Board:
+        board = self._boards.get(name)
+        if board is None:
+            board = self._boards[name] = Board()
+            if name.startswith("week:"):
+                weeks = sorted(n for n in self._boards if n.startswith("week:"))
+                for old in weeks[:-2]: del self._boards[old]
+        return board
+
+    def load(self, rows: Iterable[Tuple[str, str, int]]):
+        """(board, user, xp) rows, e.g. from ProgressStore.leaderboard_rows, for users not loaded yet."""
+        grouped: Dict[str, list] = {}
+        for name, user, xp in rows:
+            if xp > 0: grouped.setdefault(name, []).append((user, xp, next(self._seq)))
+        with self._lock:
+            for name, scores in grouped.items(): self._board(name).load(scores)
+
+    def record(self, user: str, amount: int, course: Optional[str] = None, ts: Optional[float] = None):
+        if amount <= 0: return
+        names = ["global", week_of(ts or time.time())] + ([f"course:{course}"] if course else [])
+        with self._lock:
+            seq = next(self._seq)
+            for name in names:
+                board = self._board(name)
+                board.set(user, board.xp(user) + amount, seq)
+
+    def top(self, board: str, k: int = 10) -> List[Entry]:
+        with self._lock:
+            b = self._boards.get(board)
+            return b.top(k) if b else []
+
+    def rank(self, board: str, user: str) -> Optional[int]:
+        with self._lock:
+            b = self._boards.get(board)
+            return b.rank(user) if b else None
+
+    def around(self, board: str, user: str, k: int = 2) -> List[Entry]:
+        with self._lock:
+            b = self._boards.get(board)
+            return b.around(user, k) if b else []
+
+    def size(self, board: str) -> int:
+        with self._lock:
+            b = self._boards.get(board)
+            return len(b) if b else 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"boards": len(self._boards), "entries": sum(len(b) for b in self._boards.values())}
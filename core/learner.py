@@ -0,0 +1,36 @@
+# core/learner.py — One session's gamification state in a single slotted object
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+@dataclass(slots=True)
+class LearnerState:
+    """XP, hearts, streak and gems for one learner.
+
+    Kept as one session_state entry instead of one entry per counter; the row it is
+    persisted as is `progress.LEARNER_FIELDS`.
+    """
+    user_id: str
+    xp_total: int = 0
+    hearts: int = 5
+    streak: int = 1
+    gems: int = 50
+    daily_goal: int = 30
+    xp_today: int = 0
+    xp_boost_until: Optional[float] = None  # epoch seconds
+
+    @classmethod
+    def from_row(cls, user_id: str, row: Dict[str, Any], today: dt.date) -> "LearnerState":
+        """Restore a stored learner, rolling the streak and daily XP over to `today`."""
+        yesterday = (today - dt.timedelta(days=1)).isoformat()
+        streak = row["streak"] if row["last_active"] == today.isoformat() else row["streak"] + 1 if row["last_active"] == yesterday else 1
+        return cls(user_id, xp_total=row["xp_total"], hearts=row["hearts"], streak=streak, gems=row["gems"],
+                   xp_today=row["xp_today"] if row["xp_day"] == today.isoformat() else 0, xp_boost_until=row["xp_boost_until"])
+
+    def to_row(self, today: dt.date) -> Dict[str, Any]:
+        return {"xp_total": self.xp_total, "hearts": self.hearts, "streak": self.streak, "gems": self.gems,
+                "xp_today": self.xp_today, "xp_day": today.isoformat(), "xp_boost_until": self.xp_boost_until,
+                "last_active": today.isoformat()}
+
+    def xp_multiplier(self, now: float) -> int:
+        return 2 if self.xp_boost_until and now < self.xp_boost_until else 1
@@ -0,0 +1,97 @@
+# core/lesson_cache.py — Cross-session LRU cache of validated lessons keyed by path + mtime/size
+import json, threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Parsed pydantic objects are several times larger than the JSON on disk.
+OVERHEAD_FACTOR = 4
+
+def _read_json(path: Path):
+    with open(path, encoding="utf-8") as f: return json.load(f)
+
+class LessonCache:
+    """Parses and validates each lesson file once per (mtime, size) for all sessions.
+
+    Entries are charged `file size * OVERHEAD_FACTOR` bytes against `max_bytes` and
+    evicted least-recently-used first. Concurrent misses on the same path wait for a
+    single parse instead of each parsing the file.
+    """
+
+    def __init__(self, model, max_bytes: int = 64 << 20):
+        self.model = model
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Lock] = {}
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.fs_calls = {"stat": 0, "read": 0}
+
+    def get(self, path: Path):
+        """Return the validated lesson, or None if the file is missing. Raises ValidationError."""
+        key = str(path)
+        self.fs_calls["stat"] += 1
+        try: st = Path(path).stat()
+        except OSError:
+            self.invalidate(path)
+            return None
+        return self._fetch(key, (st.st_mtime_ns, st.st_size), st.st_size, lambda: self._read(path))
+
+    def _read(self, path: Path):
+        self.fs_calls["read"] += 1
+        return _read_json(path)
+
+    def get_bundled(self, bundle, course: str, section: str, lesson: str):
+        """Same as `get` for a lesson stored in a LessonBundle; entries die with the bundle's mtime."""
+        hit = bundle.locate(course, section, lesson)
+        if not hit: return None
+        offset, length, _ = hit
+        return self._fetch(f"{bundle.path}:{course}/{section}/{lesson}", (bundle.mtime_ns, offset), length,
+                           lambda: bundle.load(course, section, lesson))
+
+    def _fetch(self, key: str, sig, size: int, read):
+        hit = self._lookup(key, sig)
+        if hit is not None: return hit
+        with self._lock: load_lock = self._inflight.setdefault(key, threading.Lock())
+        with load_lock:
+            hit = self._lookup(key, sig, count_miss=False)
+            if hit is not None: return hit
+            try:
+                obj = self.model(**read())
+                self._store(key, sig, obj, size * OVERHEAD_FACTOR)
+            finally:
+                with self._lock: self._inflight.pop(key, None)
+        return obj
+
+    def _lookup(self, key: str, sig, count_miss: bool = True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == sig:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if count_miss: self.misses += 1
+            return None
+
+    def _store(self, key: str, sig, obj, cost: int):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old: self.bytes -= old[2]
+            if cost > self.max_bytes: return
+            self._entries[key] = (sig, obj, cost)
+            self.bytes += cost
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def invalidate(self, path: Path):
+        with self._lock:
+            old = self._entries.pop(str(path), None)
+            if old: self.bytes -= old[2]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
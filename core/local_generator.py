@@ -0,0 +1,177 @@
+# core/local_generator.py — In-process lesson generator on a small seq2seq model (transformers, CPU)
+#
+# Drop-in for the remote agent: `LocalGenerator.generate(payload)` returns {"ok": True, "data": lesson}.
+# The source is extracted with BeautifulSoup and split into sections; the model summarises each
+# section and writes one question/answer pair per section, which become flashcards and quizzes
+# (other sections' answers serve as distractors). transformers/torch/bs4 are imported on first use.
+import random, re, threading, time
+from concurrent.futures import Future
+from queue import Empty, Queue
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MODEL = "google/flan-t5-small"
+FILLER_CHOICES = ["None of the above", "All of the above", "It is not covered in this lesson",
+                  "The text gives no answer"]  # one more than needed, so three remain when the answer is a filler
+
+def local_backend_available() -> bool:
+    from importlib.util import find_spec
+    return all(find_spec(m) for m in ("torch", "transformers", "bs4"))
+
+# ---------- Source extraction ----------
+def fetch_source(source: Dict[str, Any], timeout: float = 20) -> Tuple[str, bool]:
+    """(text, is_html) for a payload source; URLs are fetched, markdown is used as given."""
+    if source.get("type") == "url":
+        import requests
+        r = requests.get(source["value"], timeout=timeout, headers={"User-Agent": "ai-learn-local-generator"})
+        r.raise_for_status()
+        return r.text, True
+    return str(source.get("value", "")), False
+
+def extract_blocks(text: str, is_html: bool) -> Tuple[str, List[Tuple[str, str]]]:
+    """(page title, [(heading, paragraph)]) in document order."""
+    from bs4 import BeautifulSoup
+    blocks, heading, title = [], "", ""
+    if is_html:
+        soup = BeautifulSoup(text, "html.parser")
+        for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form", "noscript"]): tag.decompose()
+        title = soup.title.get_text(" ", strip=True) if soup.title else ""
+        root = soup.find("article") or soup.find("main") or soup.body or soup
+        for el in root.find_all(["h1", "h2", "h3", "p", "li", "pre"]):
+            txt = el.get_text(" ", strip=True)
+            if not txt: continue
+            if el.name in ("h1", "h2", "h3"): heading = txt
+            else: blocks.append((heading, txt))
+    else:
+        for para in re.split(r"\n\s*\n", text):
+            for line in para.strip().splitlines():
+                m = re.match(r"#{1,3}\s+(.*)", line.strip())
+                if m: heading = m.group(1).strip()
+            body = "\n".join(l for l in para.strip().splitlines() if not re.match(r"\s*#{1,6}\s", l))
+            body = BeautifulSoup(body, "html.parser").get_text(" ", strip=True)  # drop inline HTML
+            if body: blocks.append((heading, body))
+        title = next((h for h, _ in blocks if h), "")
+    return title, blocks
+
+def chunk_sections(blocks: List[Tuple[str, str]], max_chars: int = 1500, max_sections: int = 6) -> List[Tuple[str, str]]:
+    """Group paragraphs under their heading, splitting groups longer than `max_chars`."""
+    sections: List[Tuple[str, str]] = []
+    for heading, para in blocks:
+        if sections and sections[-1][0] == heading and len(sections[-1][1]) + len(para) < max_chars:
+            sections[-1] = (heading, sections[-1][1] + "\n\n" + para[:max_chars])
+        else:
+            sections.append((heading, para[:max_chars]))
+        if len(sections) > max_sections: return sections[:max_sections]
+    return sections
+
+# ---------- Model ----------
+class LocalGenerator:
+    """One tokenizer/model per process; prompts from concurrent callers are batched into shared `generate` calls."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_batch: int = 8, max_new_tokens: int = 96,
+                 max_input_tokens: int = 512, batch_wait: float = 0.02, max_sections: int = 6):
+        self.model_name, self.max_batch, self.max_new_tokens = model_name, max_batch, max_new_tokens
+        self.max_input_tokens, self.batch_wait, self.max_sections = max_input_tokens, batch_wait, max_sections
+        self._load_lock = threading.Lock()
+        self._tokenizer = self._model = None
+        self._queue: "Queue[Tuple[List[str], Future]]" = Queue()
+        self._worker: Optional[threading.Thread] = None
+        self.batches = self.prompts = 0
+
+    def _load(self):
+        with self._load_lock:
+            if self._model is None:
+                import torch
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self._model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name, torch_dtype=torch.float32).eval()
+            return self._tokenizer, self._model
+
+    def complete(self, prompts: List[str]) -> List[str]:
+        """Run prompts through the model; blocks until this caller's batch is done."""
+        if not prompts: return []
+        fut: Future = Future()
+        self._queue.put((prompts, fut))
+        with self._load_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._serve, name="local-generator", daemon=True)
+                self._worker.start()
+        return fut.result()
+
+    def _serve(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while sum(len(p) for p, _ in items) < self.max_batch:
+                try: items.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except Empty: break
+            flat = [p for prompts, _ in items for p in prompts]
+            try:
+                out = self._generate(flat)
+            except Exception as e:
+                for _, fut in items: fut.set_exception(e)
+                continue
+            for prompts, fut in items:
+                fut.set_result(out[:len(prompts)])
+                out = out[len(prompts):]
+
+    def _generate(self, prompts: List[str]) -> List[str]:
+        import torch
+        tok, model = self._load()
+        # length-sorted batches pad less; results are put back in prompt order
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+        out: List[str] = [""] * len(prompts)
+        for start in range(0, len(order), self.max_batch):
+            idx = order[start:start + self.max_batch]
+            enc = tok([prompts[i] for i in idx], return_tensors="pt", padding=True, truncation=True,
+                      max_length=self.max_input_tokens)
+            with torch.inference_mode():
+                ids = model.generate(**enc, max_new_tokens=self.max_new_tokens, num_beams=1, do_sample=False)
+            for i, text in zip(idx, tok.batch_decode(ids, skip_special_tokens=True)): out[i] = text.strip()
+            self.batches += 1
+        self.prompts += len(prompts)
+        return out
+
+    # ---------- Lessons ----------
+    def generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        text, is_html = fetch_source(payload.get("source") or {})
+        page_title, blocks = extract_blocks(text, is_html)
+        sections = chunk_sections(blocks, max_sections=self.max_sections)
+        if not sections: return {"ok": False, "error": "no text found in source"}
+        summaries = self.complete([f"Summarize: {body}" for _, body in sections] +
+                                  [f"Summarize in one sentence: {' '.join(b for _, b in sections)[:2000]}"])
+        subtitle = summaries.pop()
+        questions = self.complete([f"Generate a question about this text: {body}" for _, body in sections])
+        answers = self.complete([f"Answer the question using the text.\nQuestion: {q}\nText: {body}"
+                                 for q, (_, body) in zip(questions, sections)])
+        return {"ok": True, "data": self._lesson(payload, page_title, sections, summaries, subtitle, questions, answers)}
+
+    def _lesson(self, payload, page_title, sections, summaries, subtitle, questions, answers) -> Dict[str, Any]:
+        opts = payload.get("options") or {}
+        rng = random.Random(payload.get("lesson_key"))
+        quizzes = []
+        for n, (q, a) in enumerate(zip(questions, answers)):
+            if not q or not a: continue
+            wrong = [x for x in answers if x and x != a]
+            rng.shuffle(wrong)
+            choices = [x for x in dict.fromkeys(wrong + FILLER_CHOICES) if x != a][:3] + [a]
+            rng.shuffle(choices)
+            quizzes.append({"id": f"q{n + 1}", "q": q, "choices": choices, "answer_index": choices.index(a),
+                            "explain": summaries[n], "xp_correct": 5, "xp_incorrect": 0})
+        return {
+            "version": "1.0",
+            "metadata": {"course_key": payload.get("course_key"), "section_key": payload.get("section_key"),
+                         "lesson_key": payload.get("lesson_key"), "source_url": (payload.get("source") or {}).get("value", "")
+                         if (payload.get("source") or {}).get("type") == "url" else "",
+                         "last_updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "generator": self.model_name},
+            "overview": {"title": page_title or sections[0][0] or str(payload.get("lesson_key", "Lesson")),
+                         "subtitle": subtitle, "difficulty": opts.get("difficulty", "beginner"),
+                         "duration_minutes": int(opts.get("duration_hint", 20))},
+            "content": {"format": "markdown", "sections": [
+                {"id": f"s{n + 1}", "title": heading or f"Part {n + 1}", "body": summary or body}
+                for n, ((heading, body), summary) in enumerate(zip(sections, summaries))]},
+            "flashcards": [{"id": f"fc{n + 1}", "q": q, "a": a, "xp": 2} for n, (q, a) in enumerate(zip(questions, answers)) if q and a],
+            "quizzes": quizzes,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"model": self.model_name, "loaded": self._model is not None, "batches": self.batches, "prompts": self.prompts}
@@ -0,0 +1,126 @@
+# core/metrics.py — Opt-in timing spans, counters and cache gauges with Prometheus/JSON export
+import contextlib, functools, json, os, threading, time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional
+
+_NOOP = contextlib.nullcontext()
+
+def _quantile(sorted_vals, q: float) -> float:
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))] if sorted_vals else 0.0
+
+class Metrics:
+    """Process-wide span timings and counters.
+
+    Disabled by default: `span` then hands back a shared no-op context manager and
+    `timed`/`count` return after one attribute check. Each span name keeps its last
+    `window` durations for quantiles plus running count/sum totals.
+    """
+
+    def __init__(self, enabled: bool = False, window: int = 2048):
+        self.enabled, self.window = enabled, window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._totals: Dict[str, list] = {}  # name -> [count, sum]
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self.started = time.time()
+
+    # ---------- Recording ----------
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    @contextlib.contextmanager
+    def _span(self, name: str):
+        t0 = time.perf_counter()
+        try: yield
+        finally: self.observe(name, time.perf_counter() - t0)
+
+    def span(self, name: str):
+        return self._span(name) if self.enabled else _NOOP
+
+    def timed(self, name: str):
+        """Decorator form of `span`."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled: return fn(*args, **kwargs)
+                t0 = time.perf_counter()
+                try: return fn(*args, **kwargs)
+                finally: self.observe(name, time.perf_counter() - t0)
+            return inner
+        return wrap
+
+    def count(self, name: str, n: float = 1):
+        if not self.enabled: return
+        with self._lock: self._counters[name] = self._counters.get(name, 0) + n
+
+    def gauge(self, name: str, read: Callable[[], Dict[str, float]]):
+        """Register a callback returning {field: value}, read at snapshot time (e.g. cache stats)."""
+        self._gauges[name] = read
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear(); self._totals.clear(); self._counters.clear()
+        self.started = time.time()
+
+    # ---------- Export ----------
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = {name: (sorted(s), *self._totals[name]) for name, s in self._samples.items()}
+            counters = dict(self._counters)
+        out_spans = {name: {"count": n, "total_ms": total * 1000, "p50_ms": _quantile(vals, 0.5) * 1000,
+                            "p95_ms": _quantile(vals, 0.95) * 1000, "max_ms": (vals[-1] if vals else 0) * 1000}
+                     for name, (vals, n, total) in sorted(spans.items())}
+        gauges = {}
+        for name, read in self._gauges.items():
+            try: gauges[name] = read()
+            except Exception: continue
+        return {"enabled": self.enabled, "since": self.started, "spans": out_spans,
+                "counters": dict(sorted(counters.items())), "gauges": gauges}
+
+    def prometheus(self, prefix: str = "ailearn") -> str:
+        snap, lines = self.snapshot(), []
+        lines.append(f"# TYPE {prefix}_span_seconds summary")
+        for name, s in snap["spans"].items():
+            label = f'name="{name}"'
+            lines.append(f'{prefix}_span_seconds{{{label},quantile="0.5"}} {s["p50_ms"] / 1000:.6f}')
+            lines.append(f'{prefix}_span_seconds{{{label},quantile="0.95"}} {s["p95_ms"] / 1000:.6f}')
+            lines.append(f"{prefix}_span_seconds_count{{{label}}} {s['count']}")
+            lines.append(f"{prefix}_span_seconds_sum{{{label}}} {s['total_ms'] / 1000:.6f}")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, v in snap["counters"].items():
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {v:g}')
+        lines.append(f"# TYPE {prefix}_gauge gauge")
+        for name, fields in snap["gauges"].items():
+            for field, v in fields.items():
+                if isinstance(v, (int, float)): lines.append(f'{prefix}_gauge{{name="{name}",field="{field}"}} {v:g}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Path):
+        """Write the snapshot atomically: Prometheus text for *.prom (textfile collector), JSON otherwise."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = self.prometheus() if path.suffix == ".prom" else json.dumps(self.snapshot(), indent=2)
+        tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+        tmp.write_text(body, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def export_every(self, path: Optional[Path], interval: float = 15.0):
+        """Start a daemon thread exporting to `path` every `interval` seconds while enabled."""
+        if not path: return
+        def loop():
+            while True:
+                time.sleep(interval)
+                if self.enabled:
+                    try: self.export(path)
+                    except OSError: pass
+        threading.Thread(target=loop, name="metrics-export", daemon=True).start()
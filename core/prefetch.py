@@ -0,0 +1,70 @@
+# core/prefetch.py — Background warm-up of the lessons a learner is likely to open next
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+class Prefetcher:
+    """Runs `load(target)` for upcoming lessons on a few daemon threads, off the script thread.
+
+    Each owner (a learner) has at most one set of pending targets: `schedule` replaces what the
+    owner asked for before and `cancel` drops it, so targets left behind by navigation are
+    skipped instead of loaded. Scheduling the same targets again (every rerun of an open
+    lesson) is a no-op. The queue holds at most `max_pending` targets across owners; past
+    that the oldest are dropped. Loads that raise are counted and otherwise ignored; the
+    foreground load reports the error.
+    """
+
+    def __init__(self, load: Callable[[Any], Any], workers: int = 2, max_pending: int = 64):
+        self.load, self.max_pending = load, max_pending
+        self._cond = threading.Condition()
+        self._queue: deque = deque()  # (owner, target)
+        self._recent: "OrderedDict[Hashable, tuple]" = OrderedDict()  # owner -> last targets scheduled
+        self._loading: set = set()
+        self.loaded = self.cancelled = self.dropped = self.failed = 0
+        for n in range(workers):
+            threading.Thread(target=self._work, name=f"lesson-prefetch-{n}", daemon=True).start()
+
+    def _purge(self, owner: Hashable):
+        kept = deque(item for item in self._queue if item[0] != owner)
+        self.cancelled += len(self._queue) - len(kept)
+        self._queue = kept
+
+    def schedule(self, owner: Hashable, targets: Iterable[Any]):
+        targets = tuple(dict.fromkeys(targets))
+        with self._cond:
+            if self._recent.get(owner) == targets:
+                self._recent.move_to_end(owner)
+                return
+            self._recent[owner] = targets
+            if len(self._recent) > 4 * self.max_pending: self._recent.popitem(last=False)
+            self._purge(owner)
+            self._queue.extend((owner, target) for target in targets)
+            while len(self._queue) > self.max_pending:
+                self._queue.popleft()
+                self.dropped += 1
+            self._cond.notify_all()
+
+    def cancel(self, owner: Hashable):
+        with self._cond:
+            self._recent.pop(owner, None)
+            self._purge(owner)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue: self._cond.wait()
+                _, target = self._queue.popleft()
+                if target in self._loading: continue
+                self._loading.add(target)
+            try:
+                self.load(target)
+                with self._cond: self.loaded += 1
+            except Exception:
+                with self._cond: self.failed += 1
+            finally:
+                with self._cond: self._loading.discard(target)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"pending": len(self._queue), "loading": len(self._loading), "loaded": self.loaded,
+                    "cancelled": self.cancelled, "dropped": self.dropped, "failed": self.failed}
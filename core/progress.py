@@ -0,0 +1,261 @@
+# core/progress.py — Durable per-user progress in SQLite (WAL) with batched write-behind
+import atexit, collections, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.sqlite_pool import ConnectionPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS learners(
+    user_id TEXT PRIMARY KEY, xp_total INTEGER NOT NULL DEFAULT 0, hearts INTEGER NOT NULL DEFAULT 5,
+    streak INTEGER NOT NULL DEFAULT 1, gems INTEGER NOT NULL DEFAULT 50, xp_today INTEGER NOT NULL DEFAULT 0,
+    xp_day TEXT, xp_boost_until REAL, last_active TEXT);
+CREATE TABLE IF NOT EXISTS completions(
+    user_id TEXT NOT NULL, course TEXT NOT NULL, section TEXT NOT NULL, lesson TEXT NOT NULL, completed_at REAL NOT NULL,
+    PRIMARY KEY(user_id, course, section, lesson)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS quiz_attempts(
+    id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, course TEXT NOT NULL, section TEXT NOT NULL, lesson TEXT NOT NULL,
+    quiz_id TEXT NOT NULL, correct INTEGER NOT NULL, ts REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS quiz_attempts_user ON quiz_attempts(user_id, course, section, lesson);
+CREATE TABLE IF NOT EXISTS xp_events(
+    id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, amount INTEGER NOT NULL, reason TEXT, course TEXT, ts REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS xp_events_user_ts ON xp_events(user_id, ts);
+CREATE INDEX IF NOT EXISTS xp_events_ts ON xp_events(ts);
+
+-- Flashcard review queue: one row per enrolled card, `review_due` orders each user's cards by due time
+CREATE TABLE IF NOT EXISTS review_cards(
+    user_id TEXT NOT NULL, course TEXT NOT NULL, section TEXT NOT NULL, lesson TEXT NOT NULL, card_id TEXT NOT NULL,
+    due REAL NOT NULL, interval REAL NOT NULL DEFAULT 0, ease REAL NOT NULL DEFAULT 2.5,
+    reps INTEGER NOT NULL DEFAULT 0, lapses INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY(user_id, course, section, lesson, card_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS review_due ON review_cards(user_id, due);
+
+-- Aggregates: per-user/unit completed counts over lessons currently in the catalog, kept by triggers
+CREATE INDEX IF NOT EXISTS completions_lesson ON completions(course, section, lesson);
+CREATE TABLE IF NOT EXISTS catalog_lessons(
+    course TEXT NOT NULL, section TEXT NOT NULL, lesson TEXT NOT NULL,
+    PRIMARY KEY(course, section, lesson)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unit_progress(
+    user_id TEXT NOT NULL, course TEXT NOT NULL, section TEXT NOT NULL, completed INTEGER NOT NULL,
+    PRIMARY KEY(user_id, course, section)) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS completion_counted AFTER INSERT ON completions
+WHEN EXISTS (SELECT 1 FROM catalog_lessons WHERE course = new.course AND section = new.section AND lesson = new.lesson)
+BEGIN
+    INSERT INTO unit_progress VALUES (new.user_id, new.course, new.section, 1)
+    ON CONFLICT(user_id, course, section) DO UPDATE SET completed = completed + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS catalog_lesson_added AFTER INSERT ON catalog_lessons
+BEGIN
+    INSERT INTO unit_progress SELECT user_id, course, section, 1 FROM completions
+    WHERE course = new.course AND section = new.section AND lesson = new.lesson
+    ON CONFLICT(user_id, course, section) DO UPDATE SET completed = completed + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS catalog_lesson_removed AFTER DELETE ON catalog_lessons
+BEGIN
+    UPDATE unit_progress SET completed = completed - 1
+    WHERE course = old.course AND section = old.section AND user_id IN (
+        SELECT user_id FROM completions WHERE course = old.course AND section = old.section AND lesson = old.lesson);
+END;
+"""
+
+REVIEW_FIELDS = ("course", "section", "lesson", "card_id", "due", "interval", "ease", "reps", "lapses")
+LEARNER_FIELDS = ("xp_total", "hearts", "streak", "gems", "xp_today", "xp_day", "xp_boost_until", "last_active")
+LEARNER_UPSERT = (f"INSERT INTO learners(user_id, {', '.join(LEARNER_FIELDS)}) VALUES (?, {', '.join('?' * len(LEARNER_FIELDS))}) "
+                  f"ON CONFLICT(user_id) DO UPDATE SET " + ", ".join(f"{c}=excluded.{c}" for c in LEARNER_FIELDS))
+
+def _learner_row(user_id: str, state: Dict[str, Any]) -> tuple:
+    return (user_id, *(state.get(c) for c in LEARNER_FIELDS))
+
+class ProgressStore:
+    """Learner progress shared by all sessions of the process.
+
+    Writes are queued in memory and committed by a background thread every
+    `flush_interval` seconds (or once `batch_size` rows are pending) in a single
+    transaction, so a burst of quiz clicks costs one fsync. A read flushes early only
+    when the reading user has queued or in-flight writes, so users always see their own writes.
+    A locked database re-queues the batch; a batch the database rejects is retried one
+    statement at a time, and only the statements that still fail are set aside in `rejected`.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 1.0, batch_size: int = 500):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval, self.batch_size = flush_interval, batch_size
+        self._pool = ConnectionPool(self.path)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: List[Tuple[str, tuple]] = []
+        self._pending_learners: Dict[str, Dict[str, Any]] = {}
+        self._dirty: set = set()
+        self._flushing: set = set()  # users whose writes are in the transaction being committed
+        self._catalog_version = None
+        self.dropped = 0
+        self.rejected: "collections.deque[Tuple[str, tuple, str]]" = collections.deque(maxlen=1000)  # (sql, params, error)
+        self._wake = threading.Event()
+        with self._pool.connection() as db: db.executescript(SCHEMA)
+        self._thread = threading.Thread(target=self._flush_loop, name="progress-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    # ---------- Write-behind ----------
+    def _enqueue(self, user_id: str, sql: str, params: tuple):
+        with self._lock:
+            self._pending.append((sql, params))
+            self._dirty.add(user_id)
+            if len(self._pending) >= self.batch_size: self._wake.set()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try: self.flush()
+            except sqlite3.Error: time.sleep(self.flush_interval)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+                learners, self._pending_learners = self._pending_learners, {}
+                self._flushing, self._dirty = self._dirty, set()
+            if not rows and not learners: return
+            try:
+                with self._pool.connection() as db, db:
+                    for sql, params in rows: db.execute(sql, params)
+                    if learners: db.executemany(LEARNER_UPSERT, [_learner_row(uid, state) for uid, state in learners.items()])
+            except sqlite3.OperationalError:
+                # locked or I/O error, rolled back: put the batch back in front of anything queued since
+                self._requeue(rows, learners)
+                raise
+            except sqlite3.Error:
+                # a statement the database rejects would fail every retry of the whole batch
+                self._salvage(rows, learners)
+            finally:
+                with self._lock: self._flushing = set()
+
+    def _requeue(self, rows: List[Tuple[str, tuple]], learners: Dict[str, Dict[str, Any]]):
+        with self._lock:
+            self._pending = rows + self._pending
+            self._pending_learners = {**learners, **self._pending_learners}
+            self._dirty |= self._flushing
+
+    def _salvage(self, rows: List[Tuple[str, tuple]], learners: Dict[str, Dict[str, Any]]):
+        """Commit a rejected batch one statement at a time, so a bad row costs only itself."""
+        stmts = rows + [(LEARNER_UPSERT, _learner_row(uid, state)) for uid, state in learners.items()]
+        with self._pool.connection() as db:
+            for n, (sql, params) in enumerate(stmts):
+                try:
+                    with db: db.execute(sql, params)
+                except sqlite3.OperationalError:
+                    self._requeue(rows[n:], dict(list(learners.items())[max(0, n - len(rows)):]))
+                    raise
+                except sqlite3.Error as e:
+                    with self._lock:
+                        self.dropped += 1
+                        self.rejected.append((sql, params, str(e)))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pending": len(self._pending) + len(self._pending_learners), "dropped": self.dropped}
+
+    def record_completion(self, user_id: str, course: str, section: str, lesson: str):
+        self._enqueue(user_id, "INSERT OR IGNORE INTO completions VALUES (?, ?, ?, ?, ?)",
+                      (user_id, course, section, lesson, time.time()))
+
+    def record_attempt(self, user_id: str, course: str, section: str, lesson: str, quiz_id: str, correct: bool):
+        self._enqueue(user_id, "INSERT INTO quiz_attempts(user_id, course, section, lesson, quiz_id, correct, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      (user_id, course, section, lesson, quiz_id, int(correct), time.time()))
+
+    def record_xp(self, user_id: str, amount: int, reason: str = "", course: Optional[str] = None):
+        self._enqueue(user_id, "INSERT INTO xp_events(user_id, amount, reason, course, ts) VALUES (?, ?, ?, ?, ?)",
+                      (user_id, amount, reason, course, time.time()))
+
+    def enroll_cards(self, user_id: str, course: str, section: str, lesson: str, card_ids: Iterable[str]):
+        """Add a lesson's flashcards to the user's review queue, due now; cards already enrolled keep their schedule."""
+        now = time.time()
+        for card_id in card_ids:
+            self._enqueue(user_id, "INSERT OR IGNORE INTO review_cards(user_id, course, section, lesson, card_id, due) "
+                          "VALUES (?, ?, ?, ?, ?, ?)", (user_id, course, section, lesson, card_id, now))
+
+    def record_review(self, user_id: str, course: str, section: str, lesson: str, card_id: str, state: Dict[str, Any]):
+        self._enqueue(user_id, "UPDATE review_cards SET due = ?, interval = ?, ease = ?, reps = ?, lapses = ? "
+                      "WHERE user_id = ? AND course = ? AND section = ? AND lesson = ? AND card_id = ?",
+                      (state["due"], state["interval"], state["ease"], state["reps"], state["lapses"],
+                       user_id, course, section, lesson, card_id))
+
+    def drop_card(self, user_id: str, course: str, section: str, lesson: str, card_id: str):
+        self._enqueue(user_id, "DELETE FROM review_cards WHERE user_id = ? AND course = ? AND section = ? AND lesson = ? AND card_id = ?",
+                      (user_id, course, section, lesson, card_id))
+
+    def save_learner(self, user_id: str, state: Dict[str, Any]):
+        """Queue the learner's scalar state; repeated saves before a flush coalesce into one row write."""
+        with self._lock:
+            self._pending_learners[user_id] = {c: state.get(c) for c in LEARNER_FIELDS}
+            self._dirty.add(user_id)
+
+    # ---------- Reads ----------
+    def _read(self, sql: str, params: tuple) -> List[tuple]:
+        # every read is scoped to one user, passed as the first parameter; flush() waits out a commit in progress
+        if params[0] in self._dirty or params[0] in self._flushing: self.flush()
+        with self._pool.connection() as db: return db.execute(sql, params).fetchall()
+
+    def load_learner(self, user_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._read(f"SELECT {', '.join(LEARNER_FIELDS)} FROM learners WHERE user_id = ?", (user_id,))
+        return dict(zip(LEARNER_FIELDS, rows[0])) if rows else None
+
+    def is_completed(self, user_id: str, course: str, section: str, lesson: str) -> bool:
+        return bool(self._read("SELECT 1 FROM completions WHERE user_id = ? AND course = ? AND section = ? AND lesson = ?",
+                               (user_id, course, section, lesson)))
+
+    def completed_by_section(self, user_id: str, course: str) -> Dict[str, int]:
+        """Completed lesson counts per unit of one course, read from the precomputed aggregate."""
+        return dict(self._read("SELECT section, completed FROM unit_progress WHERE user_id = ? AND course = ?",
+                               (user_id, course)))
+
+    def completed_in_section(self, user_id: str, course: str, section: str) -> set:
+        return {r[0] for r in self._read("SELECT lesson FROM completions WHERE user_id = ? AND course = ? AND section = ?",
+                                         (user_id, course, section))}
+
+    def completed_by_course(self, user_id: str) -> Dict[str, int]:
+        """Completed lesson counts for every course in one query (for the home grid)."""
+        return dict(self._read("SELECT course, SUM(completed) FROM unit_progress WHERE user_id = ? GROUP BY course",
+                               (user_id,)))
+
+    def due_cards(self, user_id: str, now: float, limit: int = 20) -> List[Dict[str, Any]]:
+        """The `limit` most overdue cards across all courses: one seek into `review_due`, no lesson scan."""
+        rows = self._read(f"SELECT {', '.join(REVIEW_FIELDS)} FROM review_cards WHERE user_id = ? AND due <= ? "
+                          "ORDER BY due LIMIT ?", (user_id, now, limit))
+        return [dict(zip(REVIEW_FIELDS, r)) for r in rows]
+
+    def review_counts(self, user_id: str, now: float) -> Tuple[int, int]:
+        """(due now, enrolled) card counts for the user; both are range scans of `review_due`."""
+        return tuple(self._read("SELECT (SELECT COUNT(*) FROM review_cards WHERE user_id = ?1 AND due <= ?2), "
+                                "(SELECT COUNT(*) FROM review_cards WHERE user_id = ?1)", (user_id, now))[0])
+
+    def leaderboard_rows(self, weeks: Dict[str, Tuple[float, float]]) -> Iterable[Tuple[str, str, int]]:
+        """(board, user, xp) for every learner: "global" from xp_total, "course:<key>" and the
+        named `weeks` ({board: (start, end)} epoch ranges) summed from xp_events."""
+        self.flush()
+        with self._pool.connection() as db:
+            yield from (("global", u, xp) for u, xp in db.execute("SELECT user_id, xp_total FROM learners WHERE xp_total > 0"))
+            yield from ((f"course:{c}", u, xp) for c, u, xp in db.execute(
+                "SELECT course, user_id, SUM(amount) FROM xp_events WHERE course IS NOT NULL GROUP BY course, user_id"))
+            for board, (start, end) in weeks.items():
+                yield from ((board, u, xp) for u, xp in db.execute(
+                    "SELECT user_id, SUM(amount) FROM xp_events WHERE ts >= ? AND ts < ? GROUP BY user_id", (start, end)))
+
+    # ---------- Catalog sync ----------
+    def sync_catalog(self, version, lessons: Callable[[], Iterable[Tuple[str, str, str]]]):
+        """Mirror the catalog's lesson set so aggregates only count lessons that exist.
+
+        Cheap no-op while `version` is unchanged; otherwise only the added/removed lessons
+        are written, and the triggers adjust `unit_progress` for the users who completed them.
+        """
+        if version == self._catalog_version: return
+        with self._flush_lock:
+            if version == self._catalog_version: return
+            want = set(lessons())
+            with self._pool.connection() as db, db:
+                have = set(db.execute("SELECT course, section, lesson FROM catalog_lessons"))
+                db.executemany("DELETE FROM catalog_lessons WHERE course = ? AND section = ? AND lesson = ?", have - want)
+                db.executemany("INSERT INTO catalog_lessons VALUES (?, ?, ?)", want - have)
+            self._catalog_version = version
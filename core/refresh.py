@@ -0,0 +1,227 @@
+# core/refresh.py — Regenerate only the lessons whose source page changed since they were generated
+#
+#   python -m core.refresh --courses Courses [--agent http://127.0.0.1:8765/generate_lesson] [--dry-run]
+#
+# Each lesson's `metadata.source_url` is fetched once per run (lessons sharing a URL share the fetch),
+# concurrently, with If-None-Match/If-Modified-Since from the previous run, so an unchanged page
+# costs a 304. A 200 is reduced to its readable text (local_generator.extract_blocks) and hashed,
+# so markup, scripts and navigation that change on every deploy don't count as changes. A lesson
+# is stale when the text hash it was generated from differs from its source's current one; only
+# stale lessons become GenerationJobs. Validators and hashes live in one JSON state file.
+import argparse, hashlib, json, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.generation import GenerationJob
+from core.journal import atomic_write
+from core.local_generator import extract_blocks
+
+@dataclass(frozen=True)
+class LessonSource:
+    course_key: str
+    section_key: str
+    lesson_key: str
+    url: str
+    last_updated: str = ""   # metadata.last_updated of the lesson on disk
+    difficulty: str = "beginner"
+    duration: int = 20
+
+    @property
+    def key(self) -> str:
+        return f"{self.course_key}/{self.section_key}/{self.lesson_key}"
+
+@dataclass(frozen=True)
+class SourceCheck:
+    url: str
+    status: int = 0          # HTTP status; 0 when the request failed
+    sha256: str = ""         # extracted-text hash (the stored one on a 304)
+    etag: str = ""
+    last_modified: str = ""
+    size: int = 0            # body bytes downloaded
+    error: str = ""
+
+def lesson_sources(root: Path) -> List[LessonSource]:
+    """Every lesson under `root` (<course>/<section>/<lesson>.json) with an http(s) source_url."""
+    out = []
+    for path in sorted(Path(root).glob("*/*/*.json")):
+        try:
+            with path.open(encoding="utf-8") as f: data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta, ov = data.get("metadata") or {}, data.get("overview") or {}
+        url = str(meta.get("source_url") or "")
+        if not url.startswith(("http://", "https://")): continue
+        out.append(LessonSource(path.parent.parent.name, path.parent.name, path.stem, url, str(meta.get("last_updated") or ""),
+                                str(ov.get("difficulty") or "beginner"), int(ov.get("duration_minutes") or 20)))
+    return out
+
+def text_hash(body: str) -> str:
+    """Hash of the text a generator would read from an HTML page."""
+    title, blocks = extract_blocks(body, True)
+    return hashlib.sha256(json.dumps([title, blocks], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def _when(value: str) -> Optional[datetime]:
+    """Parse an HTTP date or an ISO-8601 timestamp; None when missing or malformed."""
+    if not value: return None
+    try: t = parsedate_to_datetime(value) if "," in value else datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError): return None
+    return t if t.tzinfo else t.replace(tzinfo=timezone.utc)
+
+class SourceRefresher:
+    """Conditional source checks and the stale-lesson bookkeeping between runs.
+
+    `refresh(sources)` checks every source and returns jobs for the stale lessons; as the
+    generation queue finishes each one (its `on_finish` callback), `settle(jobs)` records the
+    hash each saved lesson was generated from. A lesson seen for the first time is taken as current unless its source's
+    Last-Modified is newer than its `metadata.last_updated`. Failed generations stay stale and
+    are offered again on the next run.
+    """
+
+    def __init__(self, state_path: Path, workers: int = 16, timeout: float = 20):
+        self.state_path, self.workers, self.timeout = Path(state_path), workers, timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = {"urls": {}, "lessons": {}}
+        try:
+            with self.state_path.open(encoding="utf-8") as f: self.state.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        self.pending: Dict[str, str] = {}  # lesson key -> source hash it is being regenerated from
+        self.last_run: Dict[str, Any] = {}
+
+    def _save(self):
+        atomic_write(self.state_path, json.dumps(self.state, separators=(",", ":")).encode("utf-8"))
+
+    # ---------- Checks ----------
+    def _fetch(self, url: str, prev: Dict[str, str]) -> SourceCheck:
+        headers = {"User-Agent": "ai-learn-refresh"}
+        if prev.get("sha256"):  # validators are only worth sending when there is a hash to fall back on
+            if prev.get("etag"): headers["If-None-Match"] = prev["etag"]
+            if prev.get("last_modified"): headers["If-Modified-Since"] = prev["last_modified"]
+        try:
+            r = self.session.get(url, headers=headers, timeout=self.timeout)
+            if r.status_code == 304:
+                return SourceCheck(url, 304, prev["sha256"], r.headers.get("ETag", prev.get("etag", "")),
+                                   r.headers.get("Last-Modified", prev.get("last_modified", "")))
+            r.raise_for_status()
+            return SourceCheck(url, r.status_code, text_hash(r.text), r.headers.get("ETag", ""),
+                               r.headers.get("Last-Modified", ""), len(r.content))
+        except requests.RequestException as e:
+            status = e.response.status_code if getattr(e, "response", None) is not None else 0
+            return SourceCheck(url, status, error=str(e))
+
+    def check(self, sources: Iterable[LessonSource]) -> Dict[str, SourceCheck]:
+        """Fetch every distinct source URL concurrently; url -> result."""
+        urls = list(dict.fromkeys(s.url for s in sources))
+        with self._lock: prev = {u: dict(self.state["urls"].get(u) or {}) for u in urls}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="source-check") as pool:
+            checks = {c.url: c for c in pool.map(lambda u: self._fetch(u, prev[u]), urls)}
+        with self._lock:
+            for c in checks.values():
+                if not c.error:
+                    self.state["urls"][c.url] = {"etag": c.etag, "last_modified": c.last_modified, "sha256": c.sha256, "checked": time.time()}
+        return checks
+
+    def stale(self, sources: Iterable[LessonSource], checks: Dict[str, SourceCheck]) -> List[LessonSource]:
+        out = []
+        with self._lock:
+            lessons = self.state["lessons"]
+            for s in sources:
+                c = checks.get(s.url)
+                if c is None or c.error or self.pending.get(s.key) == c.sha256: continue
+                have = lessons.get(s.key)
+                if have is None:
+                    modified, generated = _when(c.last_modified), _when(s.last_updated)
+                    if not (modified and generated and modified > generated):
+                        lessons[s.key] = c.sha256  # first sight: the lesson is as current as its timestamp says
+                        continue
+                elif have == c.sha256:
+                    continue
+                out.append(s)
+            self._save()
+        return out
+
+    def refresh(self, sources: Iterable[LessonSource]) -> List[GenerationJob]:
+        """Check `sources` and return generation jobs for the lessons whose source text changed."""
+        sources = list(sources)
+        t0 = time.perf_counter()
+        checks = self.check(sources)
+        stale = self.stale(sources, checks)
+        statuses = [c.status for c in checks.values()]
+        self.last_run = {"lessons": len(sources), "urls": len(checks), "not_modified": statuses.count(304),
+                         "downloaded": sum(1 for c in checks.values() if c.status == 200),
+                         "bytes": sum(c.size for c in checks.values()), "failed": sum(1 for c in checks.values() if c.error),
+                         "stale": len(stale), "seconds": time.perf_counter() - t0}
+        jobs = []
+        with self._lock:
+            for s in stale:
+                self.pending[s.key] = checks[s.url].sha256
+                jobs.append(GenerationJob(s.course_key, s.section_key, s.lesson_key, "url", s.url, s.difficulty, s.duration))
+        return jobs
+
+    def settle(self, jobs: Iterable[GenerationJob]):
+        """Record finished refresh jobs: saved lessons are current, the rest are offered again next run."""
+        changed = False
+        with self._lock:
+            for job in jobs:
+                key = f"{job.course_key}/{job.section_key}/{job.lesson_key}"
+                if job.status not in ("saved", "invalid", "failed") or key not in self.pending: continue
+                sha = self.pending.pop(key)
+                if job.status == "saved":
+                    self.state["lessons"][key] = sha
+                    changed = True
+            if changed: self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"urls": len(self.state["urls"]), "lessons": len(self.state["lessons"]), "pending": len(self.pending),
+                    "last_run": dict(self.last_run)}
+
+def main():
+    from core.agent_client import AgentClient
+    from core.generation import GenerationQueue
+    from core.journal import ChangeJournal
+    from core.schema import LessonJSON
+    ap = argparse.ArgumentParser(prog="python -m core.refresh", description="Regenerate lessons whose source page changed")
+    ap.add_argument("--courses", default="Courses", type=Path)
+    ap.add_argument("--state", default=".cache/sources.json", type=Path)
+    ap.add_argument("--journal", default=".data/changes.jsonl", type=Path, help="change journal the app follows")
+    ap.add_argument("--agent", default="http://127.0.0.1:8765/generate_lesson")
+    ap.add_argument("--workers", type=int, default=16, help="concurrent source fetches")
+    ap.add_argument("--concurrency", type=int, default=4, help="concurrent generations")
+    ap.add_argument("--dry-run", action="store_true", help="only report which lessons are stale")
+    args = ap.parse_args()
+
+    refresher = SourceRefresher(args.state, workers=args.workers)
+    jobs = refresher.refresh(lesson_sources(args.courses))
+    r = refresher.last_run
+    print(f"{r['lessons']} lessons, {r['urls']} sources in {r['seconds']:.1f}s: {r['not_modified']} not modified, "
+          f"{r['downloaded']} downloaded ({r['bytes'] / 1024:.0f} KiB), {r['failed']} failed; {r['stale']} stale", flush=True)
+    for job in jobs: print(f"  stale: {job.course_key}/{job.section_key}/{job.lesson_key}  {job.source}")
+    if args.dry_run or not jobs: return
+
+    journal = ChangeJournal(args.journal, args.courses)
+    client = AgentClient(args.agent, pool_size=args.concurrency)
+    def save(job, data):
+        path = args.courses/job.course_key/job.section_key/f"{job.lesson_key}.json"
+        journal.write_json(path, data)
+        return path
+    queue = GenerationQueue(lambda payload: client.generate(payload, use_cache=False), lambda data: LessonJSON(**data),
+                            save, max_workers=args.concurrency, on_finish=lambda job: refresher.settle([job]))
+    batch = queue.submit(jobs)
+    while not queue.finished(batch): time.sleep(0.2)
+    for job in queue.jobs(batch):
+        print(f"  {job.status:<7} {job.course_key}/{job.section_key}/{job.lesson_key}" + (f"  {job.error[:200]}" if job.error else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# core/render.py — Lesson text pre-rendered to escaped HTML once per content hash, cached in memory and on disk
+import functools, hashlib, html, json, os, re, threading, weakref
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RENDER_VERSION = 2  # bump when the output changes so stale disk entries are ignored
+
+_SAFE_URL = re.compile(r"^(https?://|mailto:|/|#)", re.I)
+
+def _math(tex: str, opts: Dict[str, Any]) -> str:
+    """TeX as MathML, which browsers render without KaTeX; the escaped source when conversion fails."""
+    display = "block" if opts.get("display_mode") else "inline"
+    try:
+        from latex2mathml.converter import convert
+        return convert(tex, display=display)
+    except Exception:  # not installed, or TeX it does not understand
+        return f"<code class='math'>{html.escape(tex)}</code>"
+
+def _highlight(code: str, lang: str, attrs: str) -> str:
+    """Pygments markup with inline styles (no stylesheet needed); empty for unknown languages."""
+    if not lang: return ""
+    try:
+        from pygments import highlight
+        from pygments.formatters import HtmlFormatter
+        from pygments.lexers import get_lexer_by_name
+        from pygments.util import ClassNotFound
+    except ImportError:
+        return ""
+    try: lexer = get_lexer_by_name(lang)
+    except ClassNotFound: return ""
+    return highlight(code, lexer, HtmlFormatter(nowrap=True, noclasses=True, style="monokai"))
+
+@functools.lru_cache(maxsize=None)
+def _renderer():
+    """CommonMark + GFM tables and strikethrough, $…$/$$…$$ math, raw HTML escaped as text."""
+    from markdown_it import MarkdownIt
+    from mdit_py_plugins.dollarmath import dollarmath_plugin
+    md = MarkdownIt("commonmark", {"html": False, "highlight": _highlight}).enable(["table", "strikethrough"])
+    md.use(dollarmath_plugin, allow_space=False, double_inline=True, renderer=_math)
+    md.validateLink = lambda url: bool(_SAFE_URL.match(url.strip())) or url.strip().lower().startswith("data:image/")
+    def heading_open(self, tokens, idx, options, env):
+        tok = tokens[idx]
+        tok.tag = f"h{min(6, int(tok.tag[1]) + 2)}"  # lesson sections sit under the page's h2/h4 headings
+        return self.renderToken(tokens, idx, options, env)
+    def link_open(self, tokens, idx, options, env):
+        tokens[idx].attrSet("target", "_blank")
+        tokens[idx].attrSet("rel", "noopener")
+        return self.renderToken(tokens, idx, options, env)
+    md.add_render_rule("heading_open", heading_open)
+    md.add_render_rule("heading_close", lambda self, tokens, idx, options, env:
+                       f"</h{min(6, int(tokens[idx].tag[1]) + 2)}>")
+    md.add_render_rule("link_open", link_open)
+    return md
+
+def markdown_to_html(text: str) -> str:
+    """CommonMark/GFM to HTML with raw HTML in the source escaped, never passed through.
+
+    Newlines become `&#10;` (still line breaks inside <pre>), so the result has none and
+    Streamlit's Markdown pass treats it as a single HTML block and leaves it alone.
+    """
+    return _renderer().render(str(text or "")).replace("\n", "&#10;")
+
+@dataclass(frozen=True)
+class RenderedLesson:
+    header: str                # title and badges
+    sections: List[str]        # one <div class='content-section'> per reading section
+    quizzes: Dict[str, str]    # quiz id -> escaped question text
+
+def render_lesson(overview: Dict[str, Any], sections: List[Dict[str, Any]], quizzes: Dict[str, str]) -> RenderedLesson:
+    e = lambda v: html.escape(str(v))
+    difficulty = str(overview.get("difficulty", ""))
+    header = (f"<div class='lesson-header'><h2>{e(overview.get('title', 'Lesson'))}</h2></div>"
+              f"<div class='lesson-meta'><span class='lesson-badge'>{e(overview.get('subtitle', ''))}</span>"
+              f"<span class='lesson-badge difficulty-{e(re.sub(r'[^a-z-]', '', difficulty.lower()))}'>{e(difficulty)}</span>"
+              f"<span class='lesson-badge'>{e(overview.get('duration_minutes', 0))} min</span></div>")
+    body = [f"<div class='content-section'><h4>{e(sec.get('title', 'Section'))}</h4>{markdown_to_html(sec.get('body', ''))}</div>"
+            for sec in sections if isinstance(sec, dict)]
+    return RenderedLesson(header, body, {qid: e(q) for qid, q in quizzes.items()})
+
+def _source(lesson) -> Dict[str, Any]:
+    """The fields that go into the HTML, as plain JSON."""
+    keep = ("title", "subtitle", "difficulty", "duration_minutes")
+    return {"overview": {k: lesson.overview.get(k) for k in keep if k in lesson.overview},
+            "sections": list(lesson.content.get("sections") or []),
+            "quizzes": {q.id: q.q for q in lesson.quizzes}}
+
+def _html_bytes(rendered: RenderedLesson) -> int:
+    return len(rendered.header) + sum(map(len, rendered.sections)) + sum(map(len, rendered.quizzes.values()))
+
+class RenderCache:
+    """Rendered lessons shared by every session.
+
+    In memory, entries are keyed by the parsed lesson object, which the lesson cache hands
+    out unchanged until its file changes, so a rerun costs one dict lookup. Entries hold only
+    a weak reference to the lesson, so a lesson evicted from the lesson cache is freed, and
+    their HTML is charged against `max_bytes`, least-recently-used first out. Under `root`,
+    they are keyed by a hash of the rendered fields, so a re-parsed or unchanged lesson
+    (and a restarted process) reuses the HTML instead of rendering it again.
+    """
+
+    def __init__(self, root: Optional[Path], max_bytes: int = 16 << 20):
+        self.root = Path(root) if root else None
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # id(lesson) -> (weakref(lesson), RenderedLesson, bytes)
+        self.bytes = 0
+        self.hits = self.disk_hits = self.renders = 0
+
+    def get(self, lesson) -> RenderedLesson:
+        key = id(lesson)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0]() is lesson:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        rendered = self._load_or_render(_source(lesson))
+        cost = _html_bytes(rendered)
+        with self._lock:
+            old = self._entries.pop(key, None)  # a dead lesson whose id was reused, or a concurrent render
+            if old: self.bytes -= old[2]
+            if cost <= self.max_bytes:
+                self._entries[key] = (weakref.ref(lesson), rendered, cost)
+                self.bytes += cost
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+        return rendered
+
+    def _load_or_render(self, src: Dict[str, Any]) -> RenderedLesson:
+        digest = hashlib.sha256(json.dumps([RENDER_VERSION, src], sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        path = self.root/digest[:2]/f"{digest}.json" if self.root else None
+        if path:
+            try:
+                with path.open(encoding="utf-8") as f: rendered = RenderedLesson(**json.load(f))
+                self.disk_hits += 1
+                return rendered
+            except (OSError, ValueError, TypeError):
+                pass
+        rendered = render_lesson(src["overview"], src["sections"], src["quizzes"])
+        self.renders += 1
+        if path:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_text(json.dumps(asdict(rendered), ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError:
+                pass
+        return rendered
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits, "disk_hits": self.disk_hits,
+                    "renders": self.renders}
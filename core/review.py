@@ -0,0 +1,28 @@
+# core/review.py — SM-2 spaced-repetition scheduling for flashcards
+from dataclasses import dataclass, replace
+
+DAY = 86400.0
+RELEARN_SECONDS = 600.0  # a forgotten card comes back within the same session
+
+# Buttons on the review page and the SM-2 quality grade (0-5) each one stands for
+GRADES = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5}
+
+@dataclass(frozen=True)
+class CardState:
+    due: float = 0.0
+    interval: float = 0.0  # days
+    ease: float = 2.5
+    reps: int = 0
+    lapses: int = 0
+
+def schedule(state: CardState, grade: int, now: float) -> CardState:
+    """Next state after a review with SM-2 quality `grade` (0-5, >= 3 means recalled)."""
+    ease = max(1.3, state.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    if grade < 3:
+        return replace(state, due=now + RELEARN_SECONDS, interval=0.0, ease=ease, reps=0, lapses=state.lapses + 1)
+    reps = state.reps + 1
+    if reps == 1: interval = 1.0
+    elif reps == 2: interval = 6.0
+    else: interval = state.interval * (1.2 if grade == 3 else ease)
+    if grade == 5: interval *= 1.3
+    return replace(state, due=now + interval * DAY, interval=interval, ease=ease, reps=reps)
@@ -0,0 +1,26 @@
+# core/schema.py — Lesson JSON schema shared by the app, the pages and offline tools
+from typing import Dict, Any, List
+from pydantic import BaseModel, conlist
+
+class Quiz(BaseModel):
+    id: str
+    q: str
+    choices: conlist(str, min_length=4, max_length=4)
+    answer_index: int
+    explain: str
+    xp_correct: int = 5
+    xp_incorrect: int = 0
+
+class Flashcard(BaseModel):
+    id: str
+    q: str
+    a: str
+    xp: int = 2
+
+class LessonJSON(BaseModel):
+    version: str
+    metadata: Dict[str, Any]
+    overview: Dict[str, Any]
+    content: Dict[str, Any]
+    flashcards: List[Flashcard] = []
+    quizzes: List[Quiz] = []
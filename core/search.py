@@ -0,0 +1,226 @@
+# core/search.py — Full-text search over lessons, sections, quizzes and flashcards (SQLite FTS5, one document per lesson)
+import re, sqlite3, string, threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.sqlite_pool import ConnectionPool
+
+SCHEMA_VERSION = 2  # bump when the layout changes; an index built by another version is rebuilt
+CANDIDATES = 3  # matches ranked per tier, as a multiple of the result limit
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)  # title, headings, body
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lessons(
+    id INTEGER PRIMARY KEY, course TEXT NOT NULL, section TEXT NOT NULL, lesson TEXT NOT NULL, sig TEXT NOT NULL,
+    UNIQUE(course, section, lesson));
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(title, headings, body, tokenize='porter unicode61', prefix='2 3');
+"""
+
+def lesson_document(data: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Flatten a lesson into one (title, headings, body) document.
+
+    Headings are section titles, quiz questions and flashcard fronts; the body holds
+    section text, choices, explanations and flashcard answers.
+    """
+    ov = data.get("overview") or {}
+    headings, body = [], [str(ov.get("subtitle", ""))]
+    for sec in (data.get("content") or {}).get("sections") or []:
+        if isinstance(sec, dict): headings.append(str(sec.get("title", ""))); body.append(str(sec.get("body", "")))
+    for q in data.get("quizzes") or []:
+        if isinstance(q, dict):
+            headings.append(str(q.get("q", "")))
+            body.append(" ".join(map(str, q.get("choices") or [])) + " " + str(q.get("explain", "")))
+    for fc in data.get("flashcards") or []:
+        if isinstance(fc, dict): headings.append(str(fc.get("q", ""))); body.append(str(fc.get("a", "")))
+    return str(ov.get("title", "")), "\n".join(headings), "\n".join(body)
+
+def to_match_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word required, the last one as a prefix."""
+    words = re.findall(r"\w+", text.lower())
+    if not words: return None
+    return " ".join(f'"{w}"' for w in words[:-1]) + (" " if len(words) > 1 else "") + f'"{words[-1]}"*'
+
+def _terms(match: str) -> re.Pattern:
+    """Words of a match query as a highlight pattern; stems are approximated by a shortened prefix."""
+    words = re.findall(r'"(\w+)"', match)
+    return re.compile(r"\b(?:" + "|".join(re.escape(w[:max(3, len(w) - 2)]) for w in words) + r")\w*", re.I)
+
+def _prefixes(match: str) -> List[str]:
+    """The word starts `_terms` highlights, as " prefix" strings to count in `_words` text."""
+    return [" " + w[:max(3, len(w) - 2)] for w in re.findall(r'"(\w+)"', match)]
+
+_SEPARATORS = str.maketrans({c: " " for c in string.punctuation + "\n\r\t"})
+
+def _words(text: str) -> str:
+    return " " + text.lower().translate(_SEPARATORS)
+
+def relevance(docs: List[Tuple[str, str, str]], prefixes: List[str], k1: float = 1.2, b: float = 0.75) -> List[float]:
+    """BM25F scores of (title, headings, body) documents for the query words in `prefixes`.
+
+    Term frequencies are weighted per column by FIELD_WEIGHTS and length-normalized against the
+    averages of `docs` itself; idf is left out, since every candidate contains every word.
+    Counting with str.count keeps this several times cheaper than a regex pass per column.
+    """
+    cols = [[_words(col) for col in doc] for doc in docs]
+    lengths = [[col.count(" ") for col in doc] for doc in cols]
+    avg = [max(1.0, sum(col) / len(docs)) for col in zip(*lengths)] if docs else []
+    scores = []
+    for doc, lens in zip(cols, lengths):
+        norms = [w / (1 - b + b * n / a) for w, n, a in zip(FIELD_WEIGHTS, lens, avg)]
+        tfs = (sum(norm * col.count(p) for norm, col in zip(norms, doc)) for p in prefixes)
+        scores.append(sum(tf / (k1 + tf) for tf in tfs))
+    return scores
+
+def snippet(texts: Iterable[str], terms: re.Pattern, width: int = 12) -> str:
+    """About `width` words around the first highlighted term in `texts`, matches in **bold**.
+
+    Done here rather than with FTS5's snippet(), which re-tokenizes the whole lesson per hit.
+    """
+    for text in texts:
+        m = terms.search(text)
+        if not m: continue
+        offset = max(0, m.start() - 80)
+        words = text[offset:].split()[1 if offset else 0:]  # the first word may be cut
+        start = next((i for i, w in enumerate(words) if terms.match(w)), 0)
+        lo = max(0, start - width // 3)
+        part = terms.sub(lambda h: f"**{h.group(0)}**", " ".join(words[lo:lo + width]))
+        return ("…" if offset or lo else "") + part + ("…" if lo + width < len(words) else "")
+    return ""
+
+class SearchIndex:
+    """Inverted index with one document per lesson; updated per lesson on save and by `sync` when the catalog changes.
+
+    Results are cached per query string until the next write, so reruns of a page with a
+    query in the box cost a dict lookup.
+    """
+
+    def __init__(self, path: Path, max_cached: int = 256):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_cached = max_cached
+        self._pool = ConnectionPool(self.path)
+        self._write_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced_version = None
+        self._results_lock = threading.Lock()
+        self._results: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+        with self._pool.connection() as db, db:
+            if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                db.executescript("DROP TABLE IF EXISTS items; DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS lessons;")
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.executescript(SCHEMA)
+
+    # ---------- Writes ----------
+    def _replace(self, db: sqlite3.Connection, course: str, section: str, lesson: str, sig: str, data: Dict[str, Any]):
+        row = db.execute("SELECT id FROM lessons WHERE course = ? AND section = ? AND lesson = ?", (course, section, lesson)).fetchone()
+        if row:
+            lesson_id = row[0]
+            db.execute("UPDATE lessons SET sig = ? WHERE id = ?", (sig, lesson_id))
+            db.execute("DELETE FROM docs WHERE rowid = ?", (lesson_id,))
+        else:
+            lesson_id = db.execute("INSERT INTO lessons(course, section, lesson, sig) VALUES (?, ?, ?, ?)",
+                                   (course, section, lesson, sig)).lastrowid
+        db.execute("INSERT INTO docs(rowid, title, headings, body) VALUES (?, ?, ?, ?)", (lesson_id, *lesson_document(data)))
+
+    def _remove(self, db: sqlite3.Connection, lesson_id: int):
+        db.execute("DELETE FROM docs WHERE rowid = ?", (lesson_id,))
+        db.execute("DELETE FROM lessons WHERE id = ?", (lesson_id,))
+
+    def _written(self):
+        with self._results_lock: self._results.clear()
+
+    def index_lesson(self, course: str, section: str, lesson: str, data: Dict[str, Any], sig: str = ""):
+        with self._write_lock, self._pool.connection() as db, db:
+            self._replace(db, course, section, lesson, sig, data)
+        self._written()
+
+    def sync(self, entries: Iterable[Tuple[str, str, str, str, Callable[[], Dict[str, Any]]]], batch: int = 500) -> Dict[str, int]:
+        """Bring the index in line with `entries` of (course, section, lesson, sig, load).
+
+        Only lessons whose signature changed are loaded and reindexed; lessons no longer
+        listed are dropped. Commits every `batch` lessons so readers are never blocked long.
+        """
+        with self._pool.connection() as db:
+            known = {(c, s, l): (i, sig) for i, c, s, l, sig in db.execute("SELECT id, course, section, lesson, sig FROM lessons")}
+        seen, pending, stats = set(), [], {"indexed": 0, "removed": 0, "unchanged": 0}
+        def commit():
+            if not pending: return
+            with self._write_lock, self._pool.connection() as db, db:
+                for c, s, l, sig, data in pending: self._replace(db, c, s, l, sig, data)
+            pending.clear()
+            self._written()
+        for course, section, lesson, sig, load in entries:
+            key = (course, section, lesson)
+            seen.add(key)
+            if key in known and known[key][1] == sig:
+                stats["unchanged"] += 1
+                continue
+            try: data = load()
+            except (OSError, ValueError): continue
+            if not isinstance(data, dict): continue
+            pending.append((course, section, lesson, sig, data))
+            stats["indexed"] += 1
+            if len(pending) >= batch: commit()
+        commit()
+        gone = [known[k][0] for k in known.keys() - seen]
+        if gone:
+            with self._write_lock, self._pool.connection() as db, db:
+                for lesson_id in gone: self._remove(db, lesson_id)
+            self._written()
+        stats["removed"] = len(gone)
+        return stats
+
+    def sync_in_background(self, version, entries: Callable[[], Iterable]):
+        """Start a sync on a daemon thread when `version` moved and no sync is already running."""
+        if version == self._synced_version or not self._sync_lock.acquire(blocking=False): return
+        def run():
+            try:
+                self.sync(entries())
+                self._synced_version = version
+            finally:
+                self._sync_lock.release()
+        threading.Thread(target=run, name="search-sync", daemon=True).start()
+
+    # ---------- Queries ----------
+    def search(self, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        match = to_match_query(text)
+        if not match: return []
+        key = (match, limit)
+        with self._results_lock:
+            hits = self._results.get(key)
+            if hits is not None:
+                self._results.move_to_end(key)
+                return hits
+        hits = self._query(match, limit)
+        with self._results_lock:
+            self._results[key] = hits
+            while len(self._results) > self.max_cached: self._results.popitem(last=False)
+        return hits
+
+    def _query(self, match: str, limit: int) -> List[Dict[str, Any]]:
+        """Best `limit` lessons for an FTS5 query: title matches, then heading matches, then body matches.
+
+        Each tier takes the first `CANDIDATES * limit` matches in rowid order and ranks them with
+        `relevance`. FTS5's bm25 is not used: its idf statistics read every matching row, which
+        for common words grows with the whole index, while the candidate cap keeps a query bounded.
+        """
+        terms, prefixes, hits, seen = _terms(match), _prefixes(match), [], set()
+        with self._pool.connection() as db:
+            for tier, expr in enumerate((f"title : ({match})", f"headings : ({match})", match)):
+                ids = [r for (r,) in db.execute("SELECT rowid FROM docs WHERE docs MATCH ? LIMIT ?",
+                                                (expr, CANDIDATES * limit)).fetchall() if r not in seen]
+                if not ids: continue
+                seen.update(ids)
+                rows = db.execute(
+                    f"SELECT l.course, l.section, l.lesson, d.title, d.headings, d.body FROM lessons l JOIN docs d ON d.rowid = l.id "
+                    f"WHERE l.id IN ({', '.join('?' * len(ids))})", ids).fetchall()  # rows removed since the match drop out
+                scores = relevance([r[3:] for r in rows], prefixes)
+                for score, (course, section, lesson, title, headings, body) in sorted(zip(scores, rows), key=lambda x: -x[0]):
+                    hits.append({"course": course, "section": section, "lesson": lesson, "title": title,
+                                 "snippet": snippet((body, headings), terms), "rank": tier, "score": round(score, 3)})
+                    if len(hits) >= limit: return hits
+        return hits
+
+    def count(self) -> int:
+        with self._pool.connection() as db: return db.execute("SELECT COUNT(*) FROM lessons").fetchone()[0]
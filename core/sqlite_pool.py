@@ -0,0 +1,43 @@
+# core/sqlite_pool.py — A few WAL-mode SQLite connections per database file, shared by all threads
+import contextlib, queue, sqlite3, threading
+from pathlib import Path
+from typing import Dict, Iterator
+
+class ConnectionPool:
+    """Up to `size` connections to one database, opened on first need and reused by any thread.
+
+    Streamlit runs every rerun and fragment rerun on a fresh script thread, so per-thread
+    connections would reopen the file and repeat the PRAGMAs on each click. `connection()`
+    checks one out for a `with` block (blocking while all `size` are in use) and rolls back
+    anything the block left uncommitted before handing it to the next thread.
+    """
+
+    def __init__(self, path: Path, size: int = 4, timeout: float = 30):
+        self.path, self.size, self.timeout = Path(path), size, timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.opened = self.checkouts = 0
+
+    def _open(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        with self._lock: self.opened += 1
+        return db
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with self._slots:
+            try: db = self._idle.get_nowait()
+            except queue.Empty: db = self._open()
+            with self._lock: self.checkouts += 1
+            try:
+                yield db
+            finally:
+                if db.in_transaction: db.rollback()
+                self._idle.put(db)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"opened": self.opened, "idle": self._idle.qsize(), "checkouts": self.checkouts}
@@ -0,0 +1,89 @@
+# core/streaming.py — NDJSON lesson streams: event format, incremental assembly and per-part validation
+#
+# A streaming agent answers `Accept: application/x-ndjson` with one event per line:
+#   {"event": "meta", "data": {"version": ..., "metadata": {...}}}
+#   {"event": "overview", "data": {...}}
+#   {"event": "content", "data": {"format": "markdown"}}
+#   {"event": "section" | "flashcard" | "quiz", "data": {...}}   (any number, in any order)
+#   {"event": "done"}  or  {"event": "error", "error": "..."}
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.generation import AgentFailure
+from core.validate import check_content, check_item, check_metadata, check_section, schema_issues
+
+PART_LISTS = {"flashcard": "flashcards", "quiz": "quizzes"}
+
+class StreamAborted(Exception):
+    """Raised by LessonAssembler.feed on the first error-level issue, so the caller can drop the connection."""
+
+    def __init__(self, issue: Dict[str, str]):
+        super().__init__(f"[{issue['check']}] {issue['message']}")
+        self.issue = issue
+
+def lesson_events(data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Replay a complete lesson as the event sequence a streaming agent would send."""
+    yield {"event": "meta", "data": {"version": data.get("version"), "metadata": data.get("metadata") or {}}}
+    yield {"event": "overview", "data": data.get("overview") or {}}
+    content = data.get("content") or {}
+    yield {"event": "content", "data": {k: v for k, v in content.items() if k != "sections"}}
+    for sec in content.get("sections") or []: yield {"event": "section", "data": sec}
+    for fc in data.get("flashcards") or []: yield {"event": "flashcard", "data": fc}
+    for q in data.get("quizzes") or []: yield {"event": "quiz", "data": q}
+    yield {"event": "done"}
+
+def apply_event(lesson: Dict[str, Any], event: Dict[str, Any]) -> Optional[str]:
+    """Fold one event into the partial `lesson` dict; returns the event kind, or None for unknown events."""
+    kind, part = event.get("event"), event.get("data")
+    if kind == "error": raise AgentFailure(str(event.get("error") or "agent reported an error"))
+    if kind == "meta":
+        lesson["version"] = (part or {}).get("version")
+        lesson["metadata"] = (part or {}).get("metadata") or {}
+    elif kind == "overview": lesson["overview"] = part or {}
+    elif kind == "content": lesson.setdefault("content", {}).update(part or {})
+    elif kind == "section": lesson.setdefault("content", {}).setdefault("sections", []).append(part)
+    elif kind in PART_LISTS: lesson.setdefault(PART_LISTS[kind], []).append(part)
+    elif kind != "done": return None
+    return kind
+
+class LessonAssembler:
+    """Builds a lesson from stream events, validating each part against its model as it arrives."""
+
+    def __init__(self, rel_parts: Optional[tuple] = None, abort_on_error: bool = True):
+        self.rel_parts, self.abort_on_error = rel_parts, abort_on_error
+        self.lesson: Dict[str, Any] = {}
+        self.issues: List[Dict[str, str]] = []
+        self.done = False
+        self._ids = {"quiz": set(), "flashcard": set()}
+
+    def feed(self, event: Dict[str, Any]) -> Tuple[Optional[str], Any, List[Dict[str, str]]]:
+        """Apply one event; returns (kind, validated part, issues raised by this part)."""
+        kind = apply_event(self.lesson, event)
+        part, issues = event.get("data"), []
+        if kind in PART_LISTS: part, issues = self._check_item(kind, part)
+        elif kind == "section": issues = check_section(len(self.lesson["content"]["sections"]) - 1, part)
+        elif kind == "meta": issues = check_metadata(self.lesson["metadata"], self.rel_parts)
+        elif kind == "done":
+            self.done = True
+            issues = self._check_lesson()
+        self.issues.extend(issues)
+        if self.abort_on_error:
+            for issue in issues:
+                if issue["level"] == "error": raise StreamAborted(issue)
+        return kind, part, issues
+
+    def _check_item(self, kind: str, part: Any):
+        from pydantic import ValidationError
+        from core.schema import Flashcard, Quiz
+        try:
+            obj = (Quiz if kind == "quiz" else Flashcard).model_validate(part)
+        except ValidationError as e:
+            return part, schema_issues(e, f"{PART_LISTS[kind]}[{len(self.lesson[PART_LISTS[kind]]) - 1}].")
+        return obj, check_item(kind, obj, self._ids[kind])
+
+    def _check_lesson(self) -> List[Dict[str, str]]:
+        """Whole-lesson schema check; the parts were already checked one by one as they arrived."""
+        from pydantic import ValidationError
+        from core.schema import LessonJSON
+        try: LessonJSON.model_validate(self.lesson)
+        except ValidationError as e: return schema_issues(e)
+        return check_content(self.lesson.get("content") or {})
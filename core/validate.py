@@ -0,0 +1,141 @@
+# core/validate.py — Bulk, parallel validation and linting of the course tree
+#
+#   python -m core.validate --courses Courses [--jobs 8] [--incremental] [--format jsonl|summary]
+#
+# Emits one JSON object per lesson ({"path", "ok", "ms", "issues": [{"level", "check", "message"}]})
+# and exits 1 when any lesson has an error-level issue.
+import argparse, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+STATE_VERSION = 1
+
+def _issue(level: str, check: str, message: str) -> Dict[str, str]:
+    return {"level": level, "check": check, "message": message}
+
+def schema_issues(err: Any, prefix: str = "") -> List[Dict[str, str]]:
+    """One error per pydantic ValidationError entry, located by `prefix` + field path."""
+    return [_issue("error", "schema", f"{prefix}{'.'.join(map(str, e['loc']))}: {e['msg']}") for e in err.errors()]
+
+def check_item(kind: str, item: Any, seen: set) -> List[Dict[str, str]]:
+    """Checks for one validated quiz or flashcard; `seen` collects the ids of its kind so far."""
+    issues = []
+    if item.id in seen: issues.append(_issue("error", f"duplicate_{kind}_id", f"{kind} id {item.id!r} appears more than once"))
+    seen.add(item.id)
+    if kind == "quiz" and not 0 <= item.answer_index < len(item.choices):
+        issues.append(_issue("error", "answer_index", f"quiz {item.id!r}: answer_index {item.answer_index} outside 0..{len(item.choices) - 1}"))
+    return issues
+
+def check_section(n: int, sec: Any) -> List[Dict[str, str]]:
+    if isinstance(sec, dict) and str(sec.get("body", "")).strip(): return []
+    return [_issue("warning", "empty_section", f"content.sections[{n}] has no body")]
+
+def check_content(content: Dict[str, Any]) -> List[Dict[str, str]]:
+    if content.get("sections"): return []
+    return [_issue("warning", "empty_sections", "content.sections is missing or empty")]
+
+def check_metadata(metadata: Dict[str, Any], rel_parts: Optional[tuple]) -> List[Dict[str, str]]:
+    """`rel_parts` is the (course, section, lesson) the lesson is stored under."""
+    issues = []
+    for key, expected in zip(("course_key", "section_key", "lesson_key"), rel_parts or ()):
+        actual = metadata.get(key)
+        if actual != expected:
+            issues.append(_issue("warning", "metadata_path", f"metadata.{key} is {actual!r} but path says {expected!r}"))
+    return issues
+
+def lint_lesson(data: Any, rel_parts: Optional[tuple] = None) -> List[Dict[str, str]]:
+    """Schema + consistency checks for one parsed lesson; `rel_parts` is (course, section, lesson)."""
+    from pydantic import ValidationError
+    from core.schema import LessonJSON
+    try:
+        obj = LessonJSON.model_validate(data)
+    except ValidationError as e:
+        return schema_issues(e)
+    issues = []
+    for kind, items in (("quiz", obj.quizzes), ("flashcard", obj.flashcards)):
+        seen = set()
+        for item in items: issues += check_item(kind, item, seen)
+    issues += check_content(obj.content)
+    for n, sec in enumerate(obj.content.get("sections") or []): issues += check_section(n, sec)
+    issues += check_metadata(obj.metadata, rel_parts)
+    return issues
+
+def validate_file(path: str, root: str) -> Dict[str, Any]:
+    """Worker entry point: parse and lint one file, timing the whole check."""
+    t0 = time.perf_counter()
+    rel = Path(path).relative_to(root)
+    parts = (rel.parts[0], rel.parts[1], rel.stem) if len(rel.parts) == 3 else None
+    try:
+        with open(path, encoding="utf-8") as f: data = json.load(f)
+        issues = lint_lesson(data, parts)
+    except (OSError, ValueError) as e:
+        issues = [_issue("error", "json", str(e))]
+    return {"path": str(rel), "ok": not any(i["level"] == "error" for i in issues),
+            "ms": round((time.perf_counter() - t0) * 1000, 3), "issues": issues}
+
+def _signature(path: Path) -> List[int]:
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+def _load_state(path: Path) -> Dict[str, Any]:
+    try:
+        with path.open(encoding="utf-8") as f: state = json.load(f)
+        return state if state.get("version") == STATE_VERSION else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(path: Path, files: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f: json.dump({"version": STATE_VERSION, "files": files}, f)
+    os.replace(tmp, path)
+
+def validate_tree(root: Path, jobs: Optional[int] = None, state_path: Optional[Path] = None) -> Iterable[Dict[str, Any]]:
+    """Yield one result per lesson under `root`; with `state_path`, unchanged files reuse their last result."""
+    root = Path(root)
+    files = sorted(root.glob("*/*/*.json"))
+    previous = _load_state(state_path).get("files", {}) if state_path else {}
+    current: Dict[str, Any] = {}
+    todo = []
+    for path in files:
+        rel, sig = str(path.relative_to(root)), _signature(path)
+        cached = previous.get(rel)
+        if cached and cached["sig"] == sig:
+            current[rel] = cached
+            yield dict(cached["result"], cached=True)
+        else:
+            todo.append((path, sig))
+    if todo:
+        chunk = max(1, len(todo) // ((jobs or os.cpu_count() or 1) * 8))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for (path, sig), result in zip(todo, pool.map(validate_file, [str(p) for p, _ in todo],
+                                                           [str(root)] * len(todo), chunksize=chunk)):
+                current[result["path"]] = {"sig": sig, "result": result}
+                yield result
+    if state_path: _save_state(state_path, current)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m core.validate", description="Validate every lesson in the course tree")
+    ap.add_argument("--courses", default="Courses", type=Path)
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--incremental", action="store_true", help="only recheck files changed since the last run")
+    ap.add_argument("--state", default=Path(".cache/validate_state.json"), type=Path)
+    ap.add_argument("--format", choices=["jsonl", "summary"], default="jsonl")
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    total = failed = warned = cached = 0
+    for result in validate_tree(args.courses, args.jobs, args.state if args.incremental else None):
+        total += 1
+        failed += not result["ok"]
+        warned += any(i["level"] == "warning" for i in result["issues"])
+        cached += result.get("cached", False)
+        if args.format == "jsonl": print(json.dumps(result, ensure_ascii=False))
+        elif result["issues"]:
+            for i in result["issues"]: print(f"{result['path']}: {i['level']}: [{i['check']}] {i['message']}")
+    print(json.dumps({"files": total, "failed": failed, "with_warnings": warned, "cached": cached,
+                      "seconds": round(time.perf_counter() - t0, 3)}), file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
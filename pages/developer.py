@@ -1,17 +1,200 @@
 # pages/developer.py — Generate → Validate → Save JSON lessons
 import streamlit as st
 from pydantic import ValidationError
-import requests
 import json
+from core.generation import build_payload, parse_jobs, JOB_FIELDS, FINISHED
+from core.validate import lint_lesson
+from core.schema import LessonJSON
+from core.local_generator import local_backend_available
+from core.streaming import LessonAssembler, StreamAborted
+from contextlib import closing
 
-ctx = st.session_state["_ctx"]
+from shared import context as ctx
 COURSES_DIR = ctx["COURSES_DIR"]
 AGENT_URL = ctx["AGENT_URL"]
-LessonJSON = ctx["LessonJSON"]
 save_json = ctx["save_json"]
+post_agent = ctx["post_agent"]
+stream_agent = ctx["stream_agent"]
+lesson_path = ctx["lesson_path"]
+get_generation_queue = ctx["generation_queue"]
+get_source_refresher = ctx["source_refresher"]
+BACKEND_LABELS = {"agent": "Remote agent", "local": "Local model (CPU)"}
+
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+def batch_mode(backend: str):
+    st.caption(f"Upload a CSV with header `{','.join(JOB_FIELDS)}` or JSONL with the same keys. "
+               "Jobs run in the background; you can leave this page while they finish.")
+    up = st.file_uploader("Jobs file", type=["csv", "jsonl"])
+    if up and st.button("Queue jobs", type="primary"):
+        try:
+            jobs = parse_jobs(up.getvalue().decode("utf-8"), "csv" if up.name.endswith(".csv") else "jsonl")
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"Could not parse jobs: {e}")
+        else:
+            if jobs: st.session_state.setdefault("gen_batches", []).append((backend, False, get_generation_queue(backend).submit(jobs)))
+            else: st.warning("No jobs found in file")
+    refresh_sources(backend)
+    # Batches the queue has pruned are gone for good; forget them here too
+    batches = [b for b in st.session_state.get("gen_batches", []) if get_generation_queue(b[0], fresh=b[1]).jobs(b[2])]
+    st.session_state["gen_batches"] = batches
+    if batches:
+        batch_progress(batches)
+
+def refresh_sources(backend: str):
+    st.markdown("**Refresh from sources**")
+    st.caption("Re-fetch every lesson's `metadata.source_url` (conditional requests, so unchanged pages cost a 304) "
+               "and regenerate only the lessons whose extracted source text changed.")
+    if st.button("Check sources"):
+        from core.refresh import lesson_sources
+        refresher = get_source_refresher()
+        with st.spinner("Checking sources…"):
+            jobs = refresher.refresh(lesson_sources(COURSES_DIR))
+        r = refresher.last_run
+        st.info(f"{r['urls']} sources for {r['lessons']} lessons in {r['seconds']:.1f}s: {r['not_modified']} not modified, "
+                f"{r['downloaded']} downloaded, {r['failed']} failed. {r['stale']} lessons to regenerate.")
+        if jobs: st.session_state.setdefault("gen_batches", []).append((backend, True, get_generation_queue(backend, fresh=True).submit(jobs)))
+
+def all_finished(batches) -> bool:
+    return all(get_generation_queue(backend, fresh=fresh).finished(batch) for backend, fresh, batch in batches)
+
+def batch_progress(batches):
+    """Poll every 2 s while a job is still pending; finished batches are drawn once, without a timer."""
+    if all_finished(batches): batch_tables(batches)
+    else: live_batch_progress(batches)
+
+@fragment(run_every=2)
+def live_batch_progress(batches):
+    batch_tables(batches)
+    if all_finished(batches): st.rerun()  # full rerun swaps this fragment for the static tables
+
+def batch_tables(batches):
+    for backend, fresh, batch in reversed(batches):
+        queue = get_generation_queue(backend, fresh=fresh)
+        rows = queue.rows(batch)
+        done = sum(r["status"] in FINISHED for r in rows)
+        saved = sum(r["status"] == "saved" for r in rows)
+        st.progress(done / max(1, len(rows)), text=f"Batch {batch}: {done}/{len(rows)} finished, {saved} saved")
+        st.dataframe([{k: r[k] for k in ("course_key", "section_key", "lesson_key", "status", "attempts", "error", "saved_to")}
+                      for r in rows], hide_index=True, use_container_width=True)
+
+def set_metrics_enabled():
+    ctx["metrics"].enabled = st.session_state["perf_enabled"]
+
+def perf_panel():
+    metrics = ctx["metrics"]
+    with st.expander("⏱ Performance", expanded=metrics.enabled):
+        st.toggle("Collect timings", value=metrics.enabled, key="perf_enabled", on_change=set_metrics_enabled,
+                  help="Process-wide: spans around shared utilities, page render blocks and full reruns.")
+        if not metrics.enabled:
+            st.caption("Off — instrumentation is a no-op. Set `PERF_METRICS = \"1\"` in secrets to collect from startup.")
+            return
+        snap = metrics.snapshot()
+        row = lambda name, s: {"name": name, "count": s["count"], "p50 ms": round(s["p50_ms"], 2),
+                               "p95 ms": round(s["p95_ms"], 2), "max ms": round(s["max_ms"], 2), "total ms": round(s["total_ms"], 1)}
+        st.markdown("**Page reruns** (app.py + page script)")
+        st.dataframe([row(n[len("rerun:"):], s) for n, s in snap["spans"].items() if n.startswith("rerun:")],
+                     hide_index=True, use_container_width=True)
+        st.markdown("**Spans**")
+        st.dataframe([row(n, s) for n, s in snap["spans"].items() if not n.startswith("rerun:")],
+                     hide_index=True, use_container_width=True)
+        cache, fs = snap["gauges"].get("lesson_cache", {}), snap["gauges"].get("fs", {})
+        c1, c2, c3, c4, c5 = st.columns(5)
+        c1.metric("Lesson cache hit rate", f"{cache.get('hit_rate', 0):.0%}")
+        c2.metric("Catalog scans", snap["gauges"].get("catalog", {}).get("scans", 0))
+        c3.metric("File reads", int(fs.get("read", 0) + snap["counters"].get("fs.read", 0)))
+        c4.metric("Dir listings", fs.get("listdir", 0))
+        c5.metric("File stats", fs.get("stat", 0))
+        if snap["gauges"].get("progress", {}).get("dropped"):
+            st.warning(f"{snap['gauges']['progress']['dropped']} progress writes were rejected by the database "
+                       "(see `ProgressStore.rejected`).")
+        d1, d2, d3 = st.columns(3)
+        d1.download_button("Prometheus text", metrics.prometheus(), file_name="ailearn.prom", use_container_width=True)
+        d2.download_button("JSON", json.dumps(snap, indent=2), file_name="ailearn-metrics.json", use_container_width=True)
+        d3.button("Reset", on_click=metrics.reset, use_container_width=True)
+
+def show_issues(issues):
+    for issue in issues:
+        (st.error if issue["level"] == "error" else st.warning)(f"[{issue['check']}] {issue['message']}")
+
+def fetch_lesson(payload, where, use_cache, backend):
+    """Blocking generation: wait for the whole response, then validate it."""
+    try:
+        res = post_agent(payload, use_cache=use_cache, backend=backend)
+    except Exception as e:
+        st.error(f"Agent error: {e}")
+        return None
+    if not res.get("ok"):
+        st.error("Agent returned failure")
+        st.json(res)
+        return None
+    data = res["data"]
+    try:
+        LessonJSON(**data)
+    except ValidationError as e:
+        st.error("Schema validation failed")
+        st.json(e.errors(), expanded=False)
+        return None
+    st.success("Schema OK")
+    show_issues(lint_lesson(data, where))
+    return data
+
+def stream_preview(payload, where, use_cache, backend):
+    """Render each part as it arrives; returns the lesson, or None when generation failed or was aborted."""
+    assembler = LessonAssembler(where)
+    status = st.status("Waiting for the agent…", expanded=True)
+    counts = {"section": 0, "flashcard": 0, "quiz": 0}
+    try:
+        with closing(stream_agent(payload, use_cache=use_cache, backend=backend)) as events:
+            for event in events:
+                kind, part, issues = assembler.feed(event)
+                with status:
+                    if kind == "overview":
+                        st.markdown(f"#### {part.get('title', 'Lesson')}")
+                        st.caption(f"{part.get('subtitle', '')} • {part.get('difficulty', '')} • {part.get('duration_minutes', 0)} min")
+                    elif kind == "section":
+                        st.markdown(f"**📄 {part.get('title', 'Section')}**")
+                        st.markdown(part.get("body", ""))
+                    elif kind == "flashcard":
+                        st.markdown(f"🃏 **{part.q}** — {part.a}")
+                    elif kind == "quiz":
+                        st.markdown(f"🧠 **{part.q}**  \n" + " • ".join(("✅ " if i == part.answer_index else "") + c
+                                                                       for i, c in enumerate(part.choices)))
+                    show_issues(issues)
+                if kind in counts:
+                    counts[kind] += 1
+                    status.update(label=f"Generating… {counts['section']} sections, {counts['flashcard']} flashcards, "
+                                        f"{counts['quiz']} quizzes")
+    except StreamAborted as e:
+        status.update(label=f"Aborted: {e}", state="error")
+        return None
+    except Exception as e:
+        status.update(label=f"Agent error: {e}", state="error")
+        return None
+    if not assembler.done:
+        status.update(label="Agent stream ended before the lesson was complete", state="error")
+        return None
+    status.update(label=f"Schema OK — {counts['section']} sections, {counts['flashcard']} flashcards, "
+                        f"{counts['quiz']} quizzes", state="complete", expanded=False)
+    return assembler.lesson
 
 st.markdown("## Developer")
 st.caption("Generate → Validate → Save JSON lessons")
+if ctx["bundle"]:
+    st.info(f"Learners are served from the compiled bundle `{ctx['bundle'].path}`. "
+            "Saved lessons go to the JSON tree and appear after `python -m core.bundle compile`.")
+
+perf_panel()
+
+backends = ["agent", "local"] if local_backend_available() else ["agent"]
+backend = st.radio("Generator", backends, format_func=BACKEND_LABELS.get, horizontal=True,
+                   index=backends.index(ctx["GENERATOR_BACKEND"]) if ctx["GENERATOR_BACKEND"] in backends else 0)
+if len(backends) == 1:
+    st.caption("Install `torch`, `transformers` and `beautifulsoup4` to generate lessons offline with a local model.")
+
+if st.radio("Mode", ["Single lesson", "Batch"], horizontal=True) == "Batch":
+    batch_mode(backend)
+    st.stop()
 
 c1, c2, c3 = st.columns(3)
 with c1: course_key = st.text_input("course_key", value="llm")
@@ -24,39 +207,27 @@ src_value = st.text_input("Lesson URL") if src_type=="url" else st.text_area("Pa
 o1, o2 = st.columns(2)
 with o1: difficulty = st.selectbox("Difficulty", ["beginner","intermediate","advanced"])
 with o2: duration = st.number_input("Duration (min)", 5, 90, 20, 5)
+fresh = st.checkbox("Ignore cached agent response", value=False)
+stream = st.checkbox("Stream preview", value=True, help="Render and validate each part as the agent produces it; "
+                     "a malformed quiz or flashcard stops the generation early.")
 
 if st.button("Generate", type="primary"):
+    st.session_state.pop("dev_draft", None)
     if not src_value:
         st.warning("Provide a URL or Markdown")
     else:
-        payload = {
-            "course_key": course_key,
-            "section_key": section_key,
-            "lesson_key": lesson_key,
-            "source": {"type": src_type, "value": src_value},
-            "options": {"difficulty": difficulty, "duration_hint": duration}
-        }
-        try:
-            r = requests.post(AGENT_URL, json=payload, timeout=90)
-            r.raise_for_status()
-            res = r.json()
-            
-            if res.get("ok"):
-                data = res["data"]
-                st.subheader("Preview JSON")
-                st.json(data, expanded=False)
-                try:
-                    LessonJSON(**data)
-                    st.success("Schema OK")
-                    save_path = COURSES_DIR/course_key/section_key/f"{lesson_key}.json"
-                    if st.button("Save to repository", type="primary", use_container_width=True):
-                        save_json(save_path, data)
-                        st.success(f"Saved: {save_path}")
-                except ValidationError as e:
-                    st.error("Schema validation failed")
-                    st.json(e.errors(), expanded=False)
-            else:
-                st.error("Agent returned failure")
-                st.json(res)
-        except Exception as e:
-            st.error(f"Agent error: {e}")
+        payload = build_payload(course_key, section_key, lesson_key, src_type, src_value, difficulty, duration)
+        where = (course_key, section_key, lesson_key)
+        data = (stream_preview if stream else fetch_lesson)(payload, where, not fresh, backend)
+        if data: st.session_state["dev_draft"] = {"where": where, "data": data}
+
+# The draft outlives the Generate click so the Save button's own rerun can still reach it
+draft = st.session_state.get("dev_draft")
+if draft:
+    save_path = lesson_path(*draft["where"])
+    st.subheader("Preview JSON")
+    st.json(draft["data"], expanded=False)
+    if st.button(f"Save to {save_path}", type="primary", use_container_width=True):
+        save_json(save_path, draft["data"])
+        st.session_state.pop("dev_draft")
+        st.success(f"Saved: {save_path}")
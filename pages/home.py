@@ -1,12 +1,20 @@
 # pages/home.py — Modern landing with hero + course cards
 import streamlit as st
+import html
 import re
-from pathlib import Path
 import random
+import time
 
-ctx = st.session_state["_ctx"]
+from core.leaderboard import week_of
+from shared import context as ctx
 COURSES_DIR = ctx["COURSES_DIR"]
-list_dirs = ctx["list_dirs"]
+catalog = ctx["catalog"]
+inject_styles = ctx["inject_styles"]
+timed = ctx["timed"]
+completed_by_course = ctx["completed_by_course"]
+learner = ctx["learner"]
+search_index = ctx["search_index"]
+leaderboard = ctx["leaderboard"]
 
 def clean_course_name(folder_name):
     """Remove numeric prefixes and clean up course names"""
@@ -36,8 +44,57 @@ def get_course_icon(course_name):
         random.seed(course_name)
         return random.choice(icons)
 
+@timed("home.search")
+def render_search():
+    query = st.text_input("Search lessons", placeholder="Search lessons, quizzes and flashcards…",
+                          key="home_search", label_visibility="collapsed")
+    if not query.strip(): return
+    hits = search_index.search(query, limit=10)  # cached per query string until the index changes
+    if not hits:
+        st.caption("No matches.")
+        return
+    for n, hit in enumerate(hits):
+        c1, c2 = st.columns([5, 1])
+        with c1:
+            st.markdown(f"📘 **{html.escape(hit['title'] or hit['lesson'])}**  \n"
+                        f"<span style='color:#CBD5E1;font-size:0.85rem'>{clean_course_name(hit['course'])} • "
+                        f"{hit['section']} • {html.escape(catalog.title(hit['course'], hit['section'], hit['lesson']))}</span>",
+                        unsafe_allow_html=True)
+            if hit["snippet"]: st.caption(hit["snippet"])
+        with c2:
+            if st.button("Open", key=f"search_open_{n}", use_container_width=True):
+                st.session_state["nav_course"] = hit["course"]
+                st.session_state["nav_section"] = hit["section"]
+                st.session_state["nav_lesson"] = hit["lesson"]
+                st.switch_page("pages/learn.py")
+
+@timed("home.leaderboard")
+def render_leaderboard():
+    me = learner()
+    boards = {week_of(time.time()): "This week", "global": "All time"}
+    boards.update({f"course:{c}": clean_course_name(c) for c in catalog.courses()})
+    c1, c2 = st.columns([3, 2])
+    with c1: st.markdown("### 🏆 Leaderboard")
+    with c2: board = st.selectbox("Board", list(boards), format_func=boards.get, key="home_board", label_visibility="collapsed")
+    top = leaderboard.top(board, 5)
+    if not top:
+        st.caption("No XP earned here yet — answer a quiz to get on the board.")
+        return
+    rows = top + [e for e in leaderboard.around(board, me.user_id, 2) if e[0] > len(top)]
+    lines = []
+    for n, (rank, uid, xp) in enumerate(rows):
+        if n and rank != rows[n - 1][0] + 1: lines.append("<div style='color:#64748B'>…</div>")
+        name = "You" if uid == me.user_id else f"Learner {html.escape(uid[:6])}"
+        weight = "font-weight:700;color:#FBBF24" if uid == me.user_id else "color:#E2E8F0"
+        lines.append(f"<div style='display:flex;justify-content:space-between;{weight}'>"
+                     f"<span>#{rank} {name}</span><span>{xp} XP</span></div>")
+    st.markdown("".join(lines), unsafe_allow_html=True)
+    rank = leaderboard.rank(board, me.user_id)
+    st.caption(f"You're #{rank} of {leaderboard.size(board)}" if rank else f"{leaderboard.size(board)} learners ranked — earn XP to join")
+
+@timed("home.header")
 def top_bar_min():
-    ss = st.session_state
+    me = learner()
     
     # Header with logo and stats
     header_container = st.container()
@@ -55,17 +112,17 @@ def top_bar_min():
             
             with stats_cols[0]:
                 with st.container():
-                    st.markdown(f"<div class='stat-card'><div class='stat-value'>🔥 {ss['streak']}</div>"
+                    st.markdown(f"<div class='stat-card'><div class='stat-value'>🔥 {me.streak}</div>"
                               f"<div class='stat-label'>Day Streak</div></div>", unsafe_allow_html=True)
             
             with stats_cols[1]:
                 with st.container():
-                    st.markdown(f"<div class='stat-card'><div class='stat-value'>♥ {ss['hearts']}</div>"
+                    st.markdown(f"<div class='stat-card'><div class='stat-value'>♥ {me.hearts}</div>"
                               f"<div class='stat-label'>Hearts</div></div>", unsafe_allow_html=True)
             
             with stats_cols[2]:
                 with st.container():
-                    st.markdown(f"<div class='stat-card'><div class='stat-value'>💎 {ss['gems']}</div>"
+                    st.markdown(f"<div class='stat-card'><div class='stat-value'>💎 {me.gems}</div>"
                               f"<div class='stat-label'>Gems</div></div>", unsafe_allow_html=True)
     
     # Progress bar for daily goal
@@ -74,12 +131,13 @@ def top_bar_min():
     with progress_container:
         col1, col2 = st.columns([4, 1])
         with col1:
-            pct = min(100, int(100 * ss["xp_today"] / max(1, ss["daily_goal"])))
-            st.progress(pct, text=f"{ss['xp_today']}/{ss['daily_goal']} XP")
+            pct = min(100, int(100 * me.xp_today / max(1, me.daily_goal)))
+            st.progress(pct, text=f"{me.xp_today}/{me.daily_goal} XP")
             st.caption(f"You've completed {pct}% of your daily goal")
         with col2:
             st.button("🛍 Shop", key="btn_shop_home", use_container_width=True, on_click=open_shop, type="primary")
 
+@timed("home.shop")
 def render_shop_modal():
     ss = st.session_state
     if not ss.get("show_shop"): return
@@ -111,8 +169,7 @@ def render_shop_modal():
         st.button("Close Shop", use_container_width=True, on_click=lambda: ss.update({"show_shop": False}))
 
 # Apply custom CSS
-with open(Path(__file__).parent.parent / "styles.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+inject_styles()
 
 # Render the UI components
 top_bar_min()
@@ -123,15 +180,18 @@ st.markdown("<h2 style='margin-top:2rem;font-size:1.8rem;'>Learn AI concepts fas
 st.markdown("<p style='font-size:1.1rem;color:#CBD5E1;margin-bottom:1.5rem;'>"
           "Choose a course below to start your learning journey. New courses are added regularly.</p>", unsafe_allow_html=True)
 
+# Search
+render_search()
+
+render_leaderboard()
+
 # Course cards section
-courses = list_dirs(COURSES_DIR)
-if not courses:
-    st.info("No courses yet. Use the Developer tab to generate your first lesson.")
-else:
+@timed("home.courses")
+def course_grid(courses):
     # Featured course (first course)
     featured_course = courses[0]
     clean_featured_name = clean_course_name(featured_course)
-    sections = list_dirs(COURSES_DIR / featured_course)
+    sections = catalog.sections(featured_course)
     
     with st.container():
         st.markdown("<h3 style='margin-bottom:1rem;'>Featured Course</h3>", unsafe_allow_html=True)
@@ -155,7 +215,7 @@ else:
             # Position the button at the bottom right
             col1, col2 = st.columns([3, 1])
             with col2:
-                if st.button("Start Learning", key=f"open_{featured_course}", type="primary"):
+                if st.button("Start Learning", key=f"featured_{featured_course}", type="primary"):
                     st.session_state["nav_course"] = featured_course
                     st.session_state["nav_section"] = None
                     st.session_state["nav_lesson"] = None
@@ -166,6 +226,9 @@ else:
     # Other courses
     st.markdown("<h3 style='margin-top:2rem;margin-bottom:1rem;'>All Courses</h3>", unsafe_allow_html=True)
     
+    # One aggregate lookup for the whole grid
+    done_by_course = completed_by_course()
+    
     # Create a responsive grid layout
     cols_per_row = 3
     other_courses = courses
@@ -177,7 +240,7 @@ else:
             with c:
                 clean_name = clean_course_name(course)
                 course_icon = get_course_icon(course)
-                sections = list_dirs(COURSES_DIR / course)
+                sections = catalog.sections(course)
                 
                 with st.container():
                     st.markdown("<div class='course-card'>", unsafe_allow_html=True)
@@ -191,9 +254,11 @@ else:
                     </div>
                     """, unsafe_allow_html=True)
                     
-                    # Progress indicator (placeholder for now)
+                    # Progress indicator
+                    done, total = done_by_course.get(course, 0), catalog.lesson_count(course)
+                    pct = int(100 * done / total) if total else 0
                     st.markdown("<div class='course-progress'>", unsafe_allow_html=True)
-                    st.progress(0, text="Not started")
+                    st.progress(pct, text=f"{done}/{total} lessons • {pct}%" if done else "Not started")
                     st.markdown("</div>", unsafe_allow_html=True)
                     
                     # Action button
@@ -204,3 +269,9 @@ else:
                         st.switch_page("pages/learn.py")
                     
                     st.markdown("</div>", unsafe_allow_html=True)
+
+courses = catalog.courses()
+if not courses:
+    st.info("No courses yet. Use the Developer tab to generate your first lesson.")
+else:
+    course_grid(courses)
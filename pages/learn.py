@@ -1,24 +1,40 @@
 # pages/learn.py — Modern Path + Lesson UI with enhanced interactivity
 import streamlit as st
-from pydantic import ValidationError
-import json
-from pathlib import Path
+import html
 
-ctx = st.session_state["_ctx"]
+from shared import context as ctx
 COURSES_DIR = ctx["COURSES_DIR"]
-LessonJSON = ctx["LessonJSON"]
-list_dirs = ctx["list_dirs"]
-list_lessons = ctx["list_lessons"]
+catalog = ctx["catalog"]
+inject_styles = ctx["inject_styles"]
+timed = ctx["timed"]
 ensure_course_selected = ctx["ensure_course_selected"]
+learner = ctx["learner"]
 xp_gain = ctx["xp_gain"]
-load_json = ctx["load_json"]
+lose_heart = ctx["lose_heart"]
+record_quiz = ctx["record_quiz"]
+complete_lesson = ctx["complete_lesson"]
+is_completed = ctx["is_completed"]
+completed_by_section = ctx["completed_by_section"]
+completed_in_section = ctx["completed_in_section"]
+load_lesson = ctx["load_lesson"]
+render_lesson = ctx["render_lesson"]
+next_lessons = ctx["next_lessons"]
+prefetch_lessons = ctx["prefetch_lessons"]
+cancel_prefetch = ctx["cancel_prefetch"]
 
+LESSONS_PER_PAGE = 10
+LESSON_KEY_PREFIXES = ("q_", "fc_")  # quiz answers and flashcard flips of the open lesson
+
+# Fragments rerun on their own, without re-executing the page; header slots are filled per full run
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+slots = {}
+
+@timed("learn.header")
 def header():
     ss = st.session_state
     
     # Apply custom CSS
-    with open(Path(__file__).parent.parent / "styles.css") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    inject_styles()
     
     # Header container with modern styling
     with st.container():
@@ -44,28 +60,102 @@ def header():
         
         with col2:
             st.markdown("<h4 style='margin-bottom:0.5rem'>Daily Goal</h4>", unsafe_allow_html=True)
-            pct = min(100, int(100 * ss["xp_today"] / max(1, ss["daily_goal"])))
-            st.progress(pct, text=f"{ss['xp_today']}/{ss['daily_goal']} XP")
-            st.caption("Keep your streak alive by meeting your daily goal!")
+            slots["goal"] = st.empty()
         
         with col3:
-            stats_cols = st.columns(3)
-            
-            with stats_cols[0]:
-                with st.container():
-                    st.markdown(f"<div class='stat-card'><div class='stat-value'>🔥 {ss['streak']}</div>"
-                              f"<div class='stat-label'>Day Streak</div></div>", unsafe_allow_html=True)
-            
-            with stats_cols[1]:
-                with st.container():
-                    st.markdown(f"<div class='stat-card'><div class='stat-value'>♥ {ss['hearts']}</div>"
-                              f"<div class='stat-label'>Hearts</div></div>", unsafe_allow_html=True)
-            
-            with stats_cols[2]:
-                with st.container():
-                    st.markdown(f"<div class='stat-card'><div class='stat-value'>💎 {ss['gems']}</div>"
-                              f"<div class='stat-label'>Gems</div></div>", unsafe_allow_html=True)
+            slots["stats"] = st.empty()
         st.markdown("</div>", unsafe_allow_html=True)
+    render_stats()
+
+def render_stats():
+    """(Re)draw the daily goal and stat cards; quiz fragments call this to update the header only."""
+    me = learner()
+    with slots["goal"].container():
+        pct = min(100, int(100 * me.xp_today / max(1, me.daily_goal)))
+        st.progress(pct, text=f"{me.xp_today}/{me.daily_goal} XP")
+        st.caption("Keep your streak alive by meeting your daily goal!")
+    
+    with slots["stats"].container():
+        stats_cols = st.columns(3)
+        
+        with stats_cols[0]:
+            with st.container():
+                st.markdown(f"<div class='stat-card'><div class='stat-value'>🔥 {me.streak}</div>"
+                          f"<div class='stat-label'>Day Streak</div></div>", unsafe_allow_html=True)
+        
+        with stats_cols[1]:
+            with st.container():
+                st.markdown(f"<div class='stat-card'><div class='stat-value'>♥ {me.hearts}</div>"
+                          f"<div class='stat-label'>Hearts</div></div>", unsafe_allow_html=True)
+        
+        with stats_cols[2]:
+            with st.container():
+                st.markdown(f"<div class='stat-card'><div class='stat-value'>💎 {me.gems}</div>"
+                          f"<div class='stat-label'>Gems</div></div>", unsafe_allow_html=True)
+
+@fragment
+def quiz_card(q, q_idx: int, where: tuple, question_html: str):
+    with st.container():
+        st.markdown("<div class='quiz-container'>", unsafe_allow_html=True)
+        # Question number and text
+        st.markdown(f"<div class='quiz-question'>"
+                  f"<span class='question-number'>Q{q_idx+1}</span>"
+                  f"<span class='question-text'>{question_html}</span>"
+                  f"</div>", unsafe_allow_html=True)
+        
+        # Answer choices with better styling
+        choice = st.radio(
+            "Choice", 
+            options=list(range(4)), 
+            format_func=lambda i: q.choices[i], 
+            key=f"q_{q.id}", 
+            horizontal=True, 
+            label_visibility="collapsed"
+        )
+        
+        # Check answer button with feedback
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            if st.button("Check Answer", key=f"chk_{q.id}", type="primary"):
+                record_quiz(*where, q.id, choice == q.answer_index)
+                if choice == q.answer_index:
+                    gained = xp_gain(q.xp_correct, reason=f"quiz:{q.id}", course=where[0])
+                    with col2:
+                        st.success(f"Correct! +{gained} XP")
+                else:
+                    lose_heart()
+                    with col2:
+                        st.error(f"Incorrect. You lost 1 heart. Correct answer: {q.choices[q.answer_index]}")
+                render_stats()
+        st.markdown("</div>", unsafe_allow_html=True)
+
+@fragment
+def flashcard_deck(cards):
+    cols = st.columns(min(3, len(cards)))
+    for idx, fc in enumerate(cards):
+        with cols[idx % len(cols)]:
+            with st.container(border=True):
+                flipped = st.session_state.get(f"fc_{fc.id}", False)
+                st.caption("Answer" if flipped else "Question")
+                st.markdown(f"**{fc.a if flipped else fc.q}**")
+                st.button("Show question" if flipped else "Show answer", key=f"flip_{fc.id}",
+                          use_container_width=True, on_click=flip_card, args=(fc.id,))
+
+def flip_card(card_id: str):
+    key = f"fc_{card_id}"
+    st.session_state[key] = not st.session_state.get(key, False)
+
+def toggle_unit(course: str, section: str):
+    key = f"unit_open_{course}_{section}"
+    st.session_state[key] = not st.session_state.get(key, False)
+
+def set_unit_page(course: str, section: str, page: int):
+    st.session_state[f"unit_page_{course}_{section}"] = max(0, page)
+
+def prune_lesson_state(keep: set):
+    """Drop the quiz answers and card flips of lessons that are no longer open."""
+    for key in [k for k in st.session_state if k.startswith(LESSON_KEY_PREFIXES) and k not in keep]:
+        del st.session_state[key]
 
 def start_lesson(course: str, section: str, lesson: str):
     st.session_state["nav_course"] = course
@@ -76,18 +166,20 @@ def start_lesson(course: str, section: str, lesson: str):
 header()
 
 # Learning Path Section
-with st.container():
+@timed("learn.path")
+def learning_path():
     st.markdown("<div class='learning-path-container'>", unsafe_allow_html=True)
     course = st.session_state["nav_course"]
     st.markdown("<h2 class='section-title'>Learning Path</h2>", unsafe_allow_html=True)
     
-    sections = list_dirs(COURSES_DIR/course)
+    sections = catalog.sections(course)
     if not sections:
         st.info("No units yet. Use the Developer page to add a lesson.")
     else:
         # Course progress overview
-        total_lessons = sum(len(list_lessons(course, sec)) for sec in sections)
-        completed_lessons = 0  # This would be tracked in a real app
+        total_lessons = catalog.lesson_count(course)
+        done_by_section = completed_by_section(course)
+        completed_lessons = sum(done_by_section.values())
         
         if total_lessons > 0:
             overall_progress = int((completed_lessons / total_lessons) * 100)
@@ -102,6 +194,8 @@ with st.container():
         
         # Units and lessons
         for unit_idx, sec in enumerate(sections, start=1):
+            lessons = catalog.lessons(course, sec)
+            unit_pct = int(100 * done_by_section.get(sec, 0) / len(lessons)) if lessons else 0
             with st.container():
                 st.markdown("<div class='unit-container'>", unsafe_allow_html=True)
                 # Unit header with modern styling
@@ -109,12 +203,11 @@ with st.container():
                           f"<div class='unit-number'>{unit_idx}</div>"
                           f"<div class='unit-details'>"
                           f"<h3>{sec.replace('_',' ').replace('-',' ').title()}</h3>"
-                          f"<div class='unit-progress'>0% complete</div>"
+                          f"<div class='unit-progress'>{unit_pct}% complete</div>"
                           f"</div>"
                           f"</div>", unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
                 
-                lessons = list_lessons(course, sec)
                 if not lessons:
                     with st.container():
                         st.markdown("<div class='empty-unit'>", unsafe_allow_html=True)
@@ -122,18 +215,35 @@ with st.container():
                         st.markdown("</div>", unsafe_allow_html=True)
                     continue
                 
+                # Collapsed units emit only their header; cards render for the open page only
+                open_key, page_key = f"unit_open_{course}_{sec}", f"unit_page_{course}_{sec}"
+                is_current = sec == st.session_state.get("nav_section")
+                st.session_state.setdefault(open_key, is_current)
+                st.button("Hide lessons" if st.session_state[open_key] else f"Show {len(lessons)} lessons",
+                          key=f"toggle_{course}_{sec}", on_click=toggle_unit, args=(course, sec))
+                if not st.session_state[open_key]:
+                    continue
+                
+                n_pages = -(-len(lessons) // LESSONS_PER_PAGE)
+                current = st.session_state.get("nav_lesson")
+                st.session_state.setdefault(page_key, lessons.index(current) // LESSONS_PER_PAGE
+                                            if is_current and current in lessons else 0)
+                page = min(st.session_state[page_key], n_pages - 1)
+                page_lessons = lessons[page*LESSONS_PER_PAGE:(page+1)*LESSONS_PER_PAGE]
+                done = completed_in_section(course, sec) if done_by_section.get(sec) else set()
+                
                 # Lesson cards with improved styling
                 st.markdown("<div class='lessons-container'>", unsafe_allow_html=True)
                 
-                rows = [lessons[i:i+2] for i in range(0, len(lessons), 2)]
+                rows = [page_lessons[i:i+2] for i in range(0, len(page_lessons), 2)]
                 for pair in rows:
                     cols = st.columns(len(pair))
                     for col, ls in zip(cols, pair):
                         with col:
                             with st.container():
                                 st.markdown("<div class='lesson-card'>", unsafe_allow_html=True)
-                                lesson_title = ls.replace('_',' ').title()
-                                st.markdown(f"<div class='lesson-icon'>📘</div>", unsafe_allow_html=True)
+                                lesson_title = html.escape(catalog.title(course, sec, ls))
+                                st.markdown(f"<div class='lesson-icon'>{'✅' if ls in done else '📘'}</div>", unsafe_allow_html=True)
                                 st.markdown(f"<h4>{lesson_title}</h4>", unsafe_allow_html=True)
                                 st.caption(f"{course.replace('_',' ').title()} • {sec.replace('_',' ').title()}")
                                 st.button("Start Lesson", 
@@ -145,80 +255,79 @@ with st.container():
                                 st.markdown("</div>", unsafe_allow_html=True)
                 
                 st.markdown("</div>", unsafe_allow_html=True)
+                
+                # Pager for long units
+                if n_pages > 1:
+                    p1, p2, p3 = st.columns([1, 2, 1])
+                    with p1:
+                        st.button("◀ Prev", key=f"prev_{course}_{sec}", disabled=page == 0,
+                                  use_container_width=True, on_click=set_unit_page, args=(course, sec, page - 1))
+                    with p2:
+                        st.caption(f"Lessons {page*LESSONS_PER_PAGE + 1}–{page*LESSONS_PER_PAGE + len(page_lessons)} "
+                                   f"of {len(lessons)} • page {page + 1}/{n_pages}")
+                    with p3:
+                        st.button("Next ▶", key=f"next_{course}_{sec}", disabled=page >= n_pages - 1,
+                                  use_container_width=True, on_click=set_unit_page, args=(course, sec, page + 1))
+    return course
+
+with st.container():
+    course = learning_path()
 
 # Render selected lesson with enhanced UI
-if st.session_state.get("nav_section") and st.session_state.get("nav_lesson"):
+@timed("learn.lesson")
+def lesson_view(course: str) -> set:
+    """Render the open lesson; returns the session keys of its quiz answers and card flips."""
+    lesson_keys = set()
     st.divider()
     
     # Load lesson data
-    path = COURSES_DIR / course / st.session_state["nav_section"] / f"{st.session_state['nav_lesson']}.json"
-    data = load_json(path)
-    
-    if data:
-        try:
-            obj = LessonJSON(**data)
-            ov = obj.overview
+    where = (course, st.session_state["nav_section"], st.session_state["nav_lesson"])
+    try:
+        obj = load_lesson(*where)
+        if obj:
+            rendered = render_lesson(obj)  # escaped HTML, built once per lesson content
+            upcoming = next_lessons(*where)
+            prefetch_lessons(upcoming)  # so "Next lesson" is a cache hit
+            lesson_keys = {f"q_{q.id}" for q in obj.quizzes} | {f"fc_{fc.id}" for fc in obj.flashcards}
             
-            # Lesson header with metadata
-            with st.container():
-                st.markdown("<div class='lesson-header'>", unsafe_allow_html=True)
-                st.markdown(f"<h2>{ov.get('title', 'Lesson')}</h2>", unsafe_allow_html=True)
-                
-                # Lesson metadata badges
-                st.markdown(f"<div class='lesson-meta'>"
-                          f"<span class='lesson-badge'>{ov.get('subtitle','')}</span>"
-                          f"<span class='lesson-badge difficulty-{ov.get('difficulty','').lower()}'>{ov.get('difficulty','')}</span>"
-                          f"<span class='lesson-badge'>{ov.get('duration_minutes',0)} min</span>"
-                          f"</div>", unsafe_allow_html=True)
+            # Lesson header with metadata badges
+            st.markdown(rendered.header, unsafe_allow_html=True)
             
             # Reading sections with improved styling
             st.markdown("<h3 class='content-section-title'>📚 Reading Material</h3>", unsafe_allow_html=True)
+            st.markdown("".join(rendered.sections), unsafe_allow_html=True)
             
-            for idx, sec in enumerate(obj.content.get("sections", [])):
-                with st.container():
-                    st.markdown("<div class='content-section'>", unsafe_allow_html=True)
-                    st.markdown(f"<h4>{sec.get('title','Section')}</h4>", unsafe_allow_html=True)
-                    st.markdown(sec.get("body",""))
-                    st.markdown("</div>", unsafe_allow_html=True)
+            # Flashcards
+            if obj.flashcards:
+                st.markdown("<h3 class='content-section-title'>🃏 Flashcards</h3>", unsafe_allow_html=True)
+                flashcard_deck(obj.flashcards)
             
             # Interactive quizzes with enhanced UI
             if obj.quizzes:
                 st.markdown("<h3 class='content-section-title'>🧠 Knowledge Check</h3>", unsafe_allow_html=True)
                 
                 for q_idx, q in enumerate(obj.quizzes):
-                    with st.container():
-                        st.markdown("<div class='quiz-container'>", unsafe_allow_html=True)
-                        # Question number and text
-                        st.markdown(f"<div class='quiz-question'>"
-                                  f"<span class='question-number'>Q{q_idx+1}</span>"
-                                  f"<span class='question-text'>{q.q}</span>"
-                                  f"</div>", unsafe_allow_html=True)
-                        
-                        # Answer choices with better styling
-                        choice = st.radio(
-                            "Choice", 
-                            options=list(range(4)), 
-                            format_func=lambda i: q.choices[i], 
-                            key=f"q_{q.id}", 
-                            horizontal=True, 
-                            label_visibility="collapsed"
-                        )
-                        
-                        # Check answer button with feedback
-                        col1, col2 = st.columns([1, 3])
-                        with col1:
-                            if st.button("Check Answer", key=f"chk_{q.id}", type="primary"):
-                                if choice == q.answer_index:
-                                    gained = xp_gain(q.xp_correct)
-                                    with col2:
-                                        st.success(f"Correct! +{gained} XP")
-                                else:
-                                    st.session_state["hearts"] = max(0, st.session_state["hearts"]-1)
-                                    with col2:
-                                        st.error(f"Incorrect. You lost 1 heart. Correct answer: {q.choices[q.answer_index]}")
-                        st.markdown("</div>", unsafe_allow_html=True)
+                    quiz_card(q, q_idx, where, rendered.quizzes[q.id])
+            
+            # Lesson completion
+            if is_completed(*where):
+                st.success("✅ Lesson completed")
+            else:
+                st.button("Complete Lesson", key=f"complete_{'_'.join(where)}", type="primary",
+                          on_click=complete_lesson, args=where)
+            if upcoming:
+                st.button("Next lesson ▶", key="next_lesson", use_container_width=True,
+                          on_click=start_lesson, args=upcoming[0])
         
-        except ValidationError:
-            st.error("Invalid lesson JSON format. Please check the lesson file.")
-    else:
-        st.error("Lesson not found. The requested lesson file could not be loaded.")
+        else:
+            st.error("Lesson not found. The requested lesson file could not be loaded.")
+    except ValueError:  # pydantic ValidationError and JSONDecodeError; pydantic loads only once a lesson opens
+        st.error("Invalid lesson JSON format. Please check the lesson file.")
+    return lesson_keys
+
+lesson_keys = set()
+if st.session_state.get("nav_section") and st.session_state.get("nav_lesson"):
+    lesson_keys = lesson_view(course)
+else:
+    cancel_prefetch()  # back on the path: drop what the last lesson queued
+prune_lesson_state(lesson_keys)
@@ -0,0 +1,84 @@
+# pages/review.py — Spaced-repetition flashcard review across every course
+import streamlit as st
+from core.review import GRADES
+
+from shared import context as ctx
+inject_styles = ctx["inject_styles"]
+timed = ctx["timed"]
+load_lesson = ctx["load_lesson"]
+due_cards = ctx["due_cards"]
+review_counts = ctx["review_counts"]
+review_card = ctx["review_card"]
+drop_card = ctx["drop_card"]
+
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+def card_key(card) -> str:
+    return "/".join((card["course"], card["section"], card["lesson"], card["card_id"]))
+
+def find_flashcard(card):
+    """The queued card's content, or None when its lesson or the card itself is gone."""
+    try: obj = load_lesson(card["course"], card["section"], card["lesson"])
+    except ValueError: return None
+    return next((fc for fc in obj.flashcards if fc.id == card["card_id"]), None) if obj else None
+
+def next_card():
+    """Most overdue card that still exists; stale queue entries are dropped on the way.
+
+    Pages through the queue until a card is found, so a run of stale entries never hides due
+    cards behind them; reads flush the drops first, so each page starts past the last one.
+    """
+    seen = set()
+    while True:
+        cards = [c for c in due_cards(20) if card_key(c) not in seen]
+        if not cards: return None, None  # queue empty, or only drops the database refused
+        for card in cards:
+            fc = find_flashcard(card)
+            if fc: return card, fc
+            seen.add(card_key(card))
+            drop_card(card)
+
+def flip(key: str):
+    st.session_state["review_flipped"] = key
+
+def grade_card(card, grade: int, xp: int):
+    gained = review_card(card, grade, xp)
+    st.session_state["review_flipped"] = None
+    st.session_state["review_last"] = f"Nice recall! +{gained} XP" if gained else None
+
+@fragment
+@timed("review.session")
+def review_session():
+    due, enrolled = review_counts()
+    c1, c2 = st.columns(2)
+    c1.metric("Due now", due)
+    c2.metric("Cards in rotation", enrolled)
+    if st.session_state.get("review_last"):
+        st.success(st.session_state.pop("review_last"))
+
+    card, fc = next_card()
+    if not card:
+        st.info("No cards due. Complete lessons to add their flashcards, or come back later."
+                if enrolled else "Complete a lesson to add its flashcards to your review queue.")
+        return
+
+    key = card_key(card)
+    flipped = st.session_state.get("review_flipped") == key
+    with st.container(border=True):
+        st.caption(f"{card['course'].replace('_', ' ').title()} • {card['section'].replace('_', ' ').title()}")
+        st.markdown(f"### {fc.q}")
+        if flipped:
+            st.divider()
+            st.markdown(f"**{fc.a}**")
+    if not flipped:
+        st.button("Show answer", key=f"review_flip_{key}", type="primary", use_container_width=True,
+                  on_click=flip, args=(key,))
+        return
+    for col, (label, grade) in zip(st.columns(len(GRADES)), GRADES.items()):
+        col.button(label, key=f"review_{label}_{key}", use_container_width=True,
+                   type="primary" if label == "Good" else "secondary", on_click=grade_card, args=(card, grade, fc.xp))
+
+inject_styles()
+st.markdown("<h1>🃏 Review</h1>", unsafe_allow_html=True)
+st.caption("Flashcards from the lessons you've completed come back just before you'd forget them.")
+review_session()
@@ -0,0 +1,422 @@
+# shared.py — Process-wide caches and utilities, imported once and shared by every page and session
+#
+# Pages read `context` from here instead of a per-session copy: module code runs once per process,
+# so sessions hold only their own state (LearnerState, navigation, widget values) between reruns.
+import streamlit as st
+from pathlib import Path
+from dataclasses import asdict
+import json, time, uuid, datetime as dt
+from typing import Dict, Any, List
+# Only stdlib-backed core modules load here; pydantic (core.schema), requests (core.agent_client,
+# core.generation) and the local model stack are imported by the code paths that use them.
+from core.catalog import CourseCatalog
+from core.lesson_cache import LessonCache
+from core.bundle import LessonBundle
+from core.progress import ProgressStore
+from core.assets import Stylesheet
+from core.search import SearchIndex
+from core.review import CardState, schedule
+from core.metrics import Metrics
+from core.journal import ChangeJournal
+from core.learner import LearnerState
+from core.render import RenderCache
+from core.leaderboard import Leaderboard, week_of, week_start
+from core.prefetch import Prefetcher
+
+# ---------- Shared config ----------
+APP_DIR = Path(__file__).parent
+COURSES_DIR = Path("Courses")
+
+def _get_secret(key: str, default: str) -> str:
+    try: return st.secrets.get(key, default)
+    except Exception: return default
+
+COURSES_BUNDLE = Path(_get_secret("COURSES_BUNDLE", "courses.bundle"))
+DEV_MODE = str(_get_secret("DEV_MODE", "0")).lower() in ("1", "true", "yes")
+AGENT_URL = _get_secret("AGENT_URL", "https://YOUR-SPACE.hf.space/generate_lesson")
+CATALOG_REFRESH_SECONDS = float(_get_secret("CATALOG_REFRESH_SECONDS", "2"))
+LESSON_CACHE_MB = int(_get_secret("LESSON_CACHE_MB", "64"))
+GEN_CONCURRENCY = int(_get_secret("GEN_CONCURRENCY", "4"))
+AGENT_CACHE_DIR = Path(_get_secret("AGENT_CACHE_DIR", ".cache/agent"))
+AGENT_CACHE_TTL_HOURS = float(_get_secret("AGENT_CACHE_TTL_HOURS", "168"))
+AGENT_CACHE_MB = int(_get_secret("AGENT_CACHE_MB", "256"))
+PROGRESS_DB = Path(_get_secret("PROGRESS_DB", ".data/progress.db"))
+SEARCH_DB = Path(_get_secret("SEARCH_DB", ".cache/search.db"))
+CHANGE_JOURNAL = Path(_get_secret("CHANGE_JOURNAL", ".data/changes.jsonl"))
+RENDER_CACHE_DIR = Path(_get_secret("RENDER_CACHE_DIR", ".cache/render"))
+REFRESH_STATE = Path(_get_secret("REFRESH_STATE", ".cache/sources.json"))
+GENERATOR_BACKEND = _get_secret("GENERATOR_BACKEND", "agent")  # "agent" (AGENT_URL) or "local" (LOCAL_MODEL on CPU)
+LOCAL_MODEL = _get_secret("LOCAL_MODEL", "google/flan-t5-small")
+PERF_METRICS = str(_get_secret("PERF_METRICS", "0")).lower() in ("1", "true", "yes")
+METRICS_EXPORT = _get_secret("METRICS_EXPORT", "")  # e.g. .cache/metrics.prom or .cache/metrics.json
+
+# ---------- Instrumentation (no-op until enabled here or on the Developer page) ----------
+@st.cache_resource
+def get_metrics() -> Metrics:
+    metrics = Metrics(enabled=PERF_METRICS)
+    metrics.export_every(Path(METRICS_EXPORT) if METRICS_EXPORT else None)
+    return metrics
+
+metrics = get_metrics()
+span, timed = metrics.span, metrics.timed
+
+# ---------- Shared caches (one per process, shared by all sessions) ----------
+@st.cache_resource
+def get_catalog() -> CourseCatalog:
+    return CourseCatalog(COURSES_DIR, refresh_interval=CATALOG_REFRESH_SECONDS)
+
+@timed("validate_lesson")
+def parse_lesson(**data):
+    from core.schema import LessonJSON
+    return LessonJSON(**data)
+
+@st.cache_resource
+def get_lesson_cache() -> LessonCache:
+    return LessonCache(parse_lesson, max_bytes=LESSON_CACHE_MB << 20)
+
+@st.cache_resource(max_entries=1)
+def get_bundle(path: str, mtime_ns: int) -> LessonBundle:
+    return LessonBundle(Path(path))
+
+def _bundle_mtime():
+    try: return COURSES_BUNDLE.stat().st_mtime_ns
+    except OSError: return None
+
+@st.cache_resource
+def get_stylesheet() -> Stylesheet:
+    return Stylesheet(APP_DIR/"styles.css")
+
+@st.cache_resource
+def get_search_index() -> SearchIndex:
+    return SearchIndex(SEARCH_DB)
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    return RenderCache(RENDER_CACHE_DIR)
+
+@st.cache_resource
+def get_journal() -> ChangeJournal:
+    return ChangeJournal(CHANGE_JOURNAL, COURSES_DIR)
+
+context: Dict[str, Any] = {}  # filled in below; the page-facing API
+
+def refresh_bundle():
+    """Once per rerun: outside dev mode a compiled bundle (python -m core.bundle compile) wins over the JSON tree."""
+    global bundle, catalog
+    bundle_mtime = None if DEV_MODE else _bundle_mtime()
+    bundle = get_bundle(str(COURSES_BUNDLE), bundle_mtime) if bundle_mtime else None
+    catalog = bundle or get_catalog()
+    context.update(bundle=bundle, catalog=catalog)
+
+refresh_bundle()
+lesson_cache = get_lesson_cache()
+render_cache = get_render_cache()
+search_index = get_search_index()
+journal = get_journal()
+
+def _hit_rate(stats: Dict[str, Any]) -> Dict[str, Any]:
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    return dict(stats, hit_rate=stats.get("hits", 0) / lookups if lookups else 0.0)
+
+metrics.gauge("lesson_cache", lambda: _hit_rate(lesson_cache.stats()))
+metrics.gauge("catalog", lambda: {"scans": getattr(catalog, "scans", 0), "version": catalog.version})
+metrics.gauge("render_cache", render_cache.stats)
+metrics.gauge("search_index", lambda: {"lessons": search_index.count()})
+
+def _fs_calls() -> Dict[str, int]:
+    """stat/listdir/read calls made by the catalog scans and lesson cache, the code that touches the tree."""
+    out = dict(lesson_cache.fs_calls, listdir=0)
+    for k, v in getattr(catalog, "fs_calls", {}).items(): out[k] = out.get(k, 0) + v
+    return out
+
+metrics.gauge("fs", _fs_calls)
+metrics.gauge("journal", journal.stats)
+
+# ---------- Shared utils ----------
+@timed("load_json")
+def load_json(path: Path):
+    metrics.count("fs.read")
+    if not path.exists(): return None
+    with path.open(encoding="utf-8") as f: return json.load(f)
+
+@timed("save_json")
+def save_json(path: Path, data: dict):
+    """Atomic, per-lesson-locked write; the caches catch up from the change journal."""
+    metrics.count("fs.write")
+    journal.write_json(path, data)
+    journal.poll()
+
+def lesson_path(course: str, section: str, lesson: str) -> Path:
+    return COURSES_DIR/course/section/f"{lesson}.json"
+
+@timed("load_lesson")
+def load_lesson(course: str, section: str, lesson: str):
+    if bundle: return lesson_cache.get_bundled(bundle, course, section, lesson)
+    return lesson_cache.get(lesson_path(course, section, lesson))
+
+@timed("render_lesson")
+def render_lesson(obj):
+    """Escaped HTML for a loaded lesson's header, reading sections and quiz questions."""
+    return render_cache.get(obj)
+
+def next_lessons(course: str, section: str, lesson: str) -> List[tuple]:
+    """The lesson after this one in its unit and the first lesson of the next unit, in path order."""
+    out, lessons, sections = [], catalog.lessons(course, section), catalog.sections(course)
+    if lesson in lessons and lessons.index(lesson) + 1 < len(lessons):
+        out.append((course, section, lessons[lessons.index(lesson) + 1]))
+    if section in sections and sections.index(section) + 1 < len(sections):
+        nxt = sections[sections.index(section) + 1]
+        out += [(course, nxt, l) for l in catalog.lessons(course, nxt)[:1]]
+    return out
+
+def _warm(where: tuple):
+    obj = load_lesson(*where)
+    if obj: render_cache.get(obj)
+
+@st.cache_resource
+def get_prefetcher() -> Prefetcher:
+    return Prefetcher(_warm, workers=2)
+
+prefetcher = get_prefetcher()
+metrics.gauge("prefetch", prefetcher.stats)
+
+def prefetch_lessons(targets: List[tuple]):
+    """Parse, validate and render these (course, section, lesson)s in the background, replacing
+    what this learner queued before."""
+    prefetcher.schedule(learner().user_id, targets)
+
+def cancel_prefetch():
+    prefetcher.cancel(learner().user_id)
+
+def search_entries():
+    """(course, section, lesson, signature, loader) for every lesson, for SearchIndex.sync."""
+    if bundle:
+        for c, s, l in bundle.all_lessons():
+            yield c, s, l, f"{bundle.mtime_ns}:{bundle.locate(c, s, l)[0]}", lambda c=c, s=s, l=l: bundle.load(c, s, l)
+        return
+    for c, s, l in catalog.all_lessons():
+        path = lesson_path(c, s, l)
+        try: stat = path.stat()
+        except OSError: continue
+        yield c, s, l, f"{stat.st_mtime_ns}:{stat.st_size}", lambda path=path: load_json(path)
+
+# ---------- Change journal followers (each keeps its own cursor) ----------
+def uncache_changes(changes):
+    for change in changes: lesson_cache.invalidate(COURSES_DIR/change.path)
+
+def index_changes(changes):
+    if bundle: return  # learners search the bundle until it is recompiled
+    for change in changes:
+        key, path = change.lesson_key(), COURSES_DIR/change.path
+        if not key: continue
+        try: stat, data = path.stat(), load_json(path)
+        except (OSError, ValueError): continue
+        if isinstance(data, dict): search_index.index_lesson(*key, data, f"{stat.st_mtime_ns}:{stat.st_size}")
+
+journal.follow("catalog", lambda changes: catalog.apply_changes(changes))
+journal.follow("lesson_cache", uncache_changes)
+journal.follow("search", index_changes)
+
+@timed("inject_styles")
+def inject_styles():
+    # Streamlit drops elements a rerun doesn't re-emit, so the <style> goes out on every full rerun;
+    # fragment reruns skip it.
+    st.markdown(get_stylesheet().html(), unsafe_allow_html=True)
+
+def ensure_seed_dirs():
+    (COURSES_DIR/"llm"/"1.introduction").mkdir(parents=True, exist_ok=True)
+
+# ---------- Lesson generation ----------
+@st.cache_resource
+def get_agent_client():
+    from core.agent_client import AgentClient, ResponseCache
+    cache = ResponseCache(AGENT_CACHE_DIR, ttl_seconds=AGENT_CACHE_TTL_HOURS * 3600, max_bytes=AGENT_CACHE_MB << 20)
+    return AgentClient(AGENT_URL, timeout=90, pool_size=max(4, GEN_CONCURRENCY), cache=cache)
+
+@st.cache_resource
+def get_local_generator():
+    from core.local_generator import LocalGenerator
+    return LocalGenerator(LOCAL_MODEL)
+
+def post_agent(payload: dict, use_cache: bool = True, backend: str = None) -> dict:
+    if (backend or GENERATOR_BACKEND) == "local": return get_local_generator().generate(payload)
+    with span("agent.generate"):
+        return get_agent_client().generate(payload, use_cache=use_cache)
+
+def stream_agent(payload: dict, use_cache: bool = True, backend: str = None):
+    if (backend or GENERATOR_BACKEND) == "local":
+        from core.streaming import lesson_events
+        res = get_local_generator().generate(payload)
+        if not res.get("ok"):
+            yield {"event": "error", "error": res.get("error", "local generation failed")}
+            return
+        yield from lesson_events(res["data"])
+        return
+    yield from get_agent_client().stream(payload, use_cache=use_cache)
+
+@st.cache_resource
+def get_source_refresher():
+    from core.refresh import SourceRefresher
+    return SourceRefresher(REFRESH_STATE)
+
+def save_generated(job, data: dict) -> Path:
+    path = lesson_path(job.course_key, job.section_key, job.lesson_key)
+    save_json(path, data)
+    return path
+
+@st.cache_resource
+def get_generation_queue(backend: str = GENERATOR_BACKEND, fresh: bool = False):
+    """One queue per backend; `fresh` queues skip the agent response cache and settle source refreshes
+    as their jobs finish, whether or not anyone is watching the batch."""
+    from core.generation import GenerationQueue
+    settle = (lambda job: get_source_refresher().settle([job])) if fresh else None
+    return GenerationQueue(lambda payload: post_agent(payload, use_cache=not fresh, backend=backend), lambda data: parse_lesson(**data),
+                           save_generated, max_workers=GEN_CONCURRENCY, on_finish=settle)
+
+# ---------- Learner state (per session, behind the session_state proxy) ----------
+ss = st.session_state
+
+@st.cache_resource
+def get_progress_store() -> ProgressStore:
+    return ProgressStore(PROGRESS_DB)
+
+progress = get_progress_store()
+metrics.gauge("progress", progress.stats)
+
+@st.cache_resource
+def get_leaderboard() -> Leaderboard:
+    board, now = Leaderboard(), time.time()
+    this_week = week_start(now)
+    last_week = week_start(this_week - 1)
+    board.load(get_progress_store().leaderboard_rows({week_of(last_week): (last_week, this_week), week_of(now): (this_week, float("inf"))}))
+    return board
+
+leaderboard = get_leaderboard()
+metrics.gauge("leaderboard", leaderboard.stats)
+
+def current_user() -> str:
+    """Stable learner id carried in the ?uid= query param so progress survives reconnects."""
+    uid = st.query_params.get("uid") or uuid.uuid4().hex
+    if st.query_params.get("uid") != uid: st.query_params["uid"] = uid
+    return uid
+
+def persist_learner(me: LearnerState):
+    progress.save_learner(me.user_id, me.to_row(dt.date.today()))
+
+def learner() -> LearnerState:
+    """This session's LearnerState, restored from the progress store on first use."""
+    me = ss.get("learner")
+    if me is None:
+        uid = current_user()
+        row = progress.load_learner(uid)
+        me = ss["learner"] = LearnerState.from_row(uid, row, dt.date.today()) if row else LearnerState(uid)
+        persist_learner(me)
+    return me
+
+def xp_gain(amount: int, reason: str = "", course: str = None):
+    me = learner()
+    gained = amount * me.xp_multiplier(time.time())
+    me.xp_total += gained
+    me.xp_today += gained
+    progress.record_xp(me.user_id, gained, reason, course)
+    leaderboard.record(me.user_id, gained, course)
+    persist_learner(me)
+    return gained
+
+def lose_heart():
+    me = learner()
+    me.hearts = max(0, me.hearts - 1)
+    persist_learner(me)
+
+def record_quiz(course: str, section: str, lesson: str, quiz_id: str, correct: bool):
+    progress.record_attempt(learner().user_id, course, section, lesson, quiz_id, correct)
+
+def complete_lesson(course: str, section: str, lesson: str):
+    uid = learner().user_id
+    progress.record_completion(uid, course, section, lesson)
+    # A finished lesson's flashcards join the learner's spaced-repetition queue
+    try: obj = load_lesson(course, section, lesson)
+    except ValueError: obj = None
+    if obj and obj.flashcards:
+        progress.enroll_cards(uid, course, section, lesson, [fc.id for fc in obj.flashcards])
+
+def is_completed(course: str, section: str, lesson: str) -> bool:
+    return progress.is_completed(learner().user_id, course, section, lesson)
+
+def completed_by_section(course: str) -> Dict[str, int]:
+    return progress.completed_by_section(learner().user_id, course)
+
+def completed_in_section(course: str, section: str) -> set:
+    return progress.completed_in_section(learner().user_id, course, section)
+
+def completed_by_course() -> Dict[str, int]:
+    return progress.completed_by_course(learner().user_id)
+
+def due_cards(limit: int = 20) -> List[Dict[str, Any]]:
+    return progress.due_cards(learner().user_id, time.time(), limit)
+
+def review_counts():
+    return progress.review_counts(learner().user_id, time.time())
+
+def review_card(card: Dict[str, Any], grade: int, xp: int = 0) -> int:
+    """Reschedule a reviewed card (SM-2); recalled cards earn their XP. Returns the XP gained."""
+    state = schedule(CardState(**{f: card[f] for f in ("due", "interval", "ease", "reps", "lapses")}), grade, time.time())
+    progress.record_review(learner().user_id, card["course"], card["section"], card["lesson"], card["card_id"], asdict(state))
+    return xp_gain(xp, reason=f"review:{card['card_id']}", course=card["course"]) if grade >= 3 and xp else 0
+
+def drop_card(card: Dict[str, Any]):
+    progress.drop_card(learner().user_id, card["course"], card["section"], card["lesson"], card["card_id"])
+
+def sync_catalog():
+    """Once per rerun: keep the completion aggregates and search index aligned with the lessons that exist."""
+    journal.poll()  # writes from other sessions and processes
+    catalog.refresh()
+    progress.sync_catalog(catalog.version, catalog.all_lessons)
+    # Journaled writes are indexed as they land; only filesystem rescans need a full sync
+    search_index.sync_in_background(bundle.version if bundle else catalog.scans, search_entries)
+
+def ensure_course_selected() -> List[str]:
+    courses = catalog.courses() or ["llm"]
+    if not ss.get("nav_course"): ss["nav_course"] = courses[0]
+    return courses
+
+# ---------- Provide context to pages ----------
+context.update({
+    "COURSES_DIR": COURSES_DIR,
+    "AGENT_URL": AGENT_URL,
+    "load_json": load_json,
+    "save_json": save_json,
+    "load_lesson": load_lesson,
+    "render_lesson": render_lesson,
+    "next_lessons": next_lessons,
+    "prefetch_lessons": prefetch_lessons,
+    "cancel_prefetch": cancel_prefetch,
+    "lesson_path": lesson_path,
+    "lesson_cache": lesson_cache,
+    "search_index": search_index,
+    "ensure_seed_dirs": ensure_seed_dirs,
+    "inject_styles": inject_styles,
+    "metrics": metrics,
+    "span": span,
+    "timed": timed,
+    "post_agent": post_agent,
+    "stream_agent": stream_agent,
+    "generation_queue": get_generation_queue,
+    "source_refresher": get_source_refresher,
+    "GENERATOR_BACKEND": GENERATOR_BACKEND,
+    "ensure_course_selected": ensure_course_selected,
+    "learner": learner,
+    "xp_gain": xp_gain,
+    "leaderboard": leaderboard,
+    "lose_heart": lose_heart,
+    "record_quiz": record_quiz,
+    "complete_lesson": complete_lesson,
+    "is_completed": is_completed,
+    "completed_by_section": completed_by_section,
+    "completed_in_section": completed_in_section,
+    "completed_by_course": completed_by_course,
+    "due_cards": due_cards,
+    "review_counts": review_counts,
+    "review_card": review_card,
+    "drop_card": drop_card,
+})
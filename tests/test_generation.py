@@ -0,0 +1,36 @@
+# tests/test_generation.py — GenerationQueue job outcomes and batch pruning
+import time
+
+from core.generation import GenerationJob, GenerationQueue
+
+def jobs(n: int = 2):
+    return [GenerationJob("c", "s", f"l{i}", "markdown", "# Notes") for i in range(n)]
+
+def wait(queue: GenerationQueue, batch: str):
+    deadline = time.time() + 5
+    while not queue.finished(batch):
+        assert time.time() < deadline, [j.status for j in queue.jobs(batch)]
+        time.sleep(0.01)
+
+def test_unexpected_save_error_fails_the_job():
+    def save(job, data): raise KeyError("no such course")
+    queue = GenerationQueue(lambda payload: {"ok": True, "data": {}}, lambda data: None, save)
+    batch = queue.submit(jobs())
+    wait(queue, batch)
+    assert [(j.status, j.error) for j in queue.jobs(batch)] == [("failed", "save failed: 'no such course'")] * 2
+
+def test_validation_and_agent_failures_finish_without_retries():
+    generate = lambda payload: {"ok": payload["lesson_key"] != "l0", "data": {}}
+    def validate(data): raise ValueError("bad lesson")
+    queue = GenerationQueue(generate, validate, lambda job, data: "saved.json")
+    batch = queue.submit(jobs())
+    wait(queue, batch)
+    assert {j.lesson_key: (j.status, j.attempts) for j in queue.jobs(batch)} == {"l0": ("failed", 1), "l1": ("invalid", 1)}
+
+def test_old_finished_batches_are_pruned():
+    queue = GenerationQueue(lambda payload: {"ok": True, "data": {}}, lambda data: None, lambda job, data: "saved.json", keep_batches=2)
+    batches = []
+    for _ in range(4):
+        batches.append(queue.submit(jobs(1)))
+        wait(queue, batches[-1])
+    assert queue.jobs(batches[0]) == [] and all(queue.jobs(b) for b in batches[1:])
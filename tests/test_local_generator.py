@@ -0,0 +1,10 @@
+# tests/test_local_generator.py — Lesson assembly from model outputs (no model loaded)
+from core.local_generator import FILLER_CHOICES, LocalGenerator
+
+def test_quiz_has_four_choices_when_the_answer_is_a_filler():
+    sections = [("Intro", "Some text.")]
+    lesson = LocalGenerator()._lesson({"lesson_key": "l1"}, "Title", sections, ["Summary."], "Subtitle.",
+                                      ["What is covered?"], [FILLER_CHOICES[0]])
+    quiz, = lesson["quizzes"]
+    assert len(set(quiz["choices"])) == 4
+    assert quiz["choices"][quiz["answer_index"]] == FILLER_CHOICES[0]
@@ -0,0 +1,17 @@
+# tests/test_progress.py — ProgressStore write-behind failure handling
+import sqlite3
+
+from core.progress import ProgressStore
+
+def count(store: ProgressStore, table: str) -> int:
+    with sqlite3.connect(store.path) as db: return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def test_rejected_statement_costs_only_itself(tmp_path):
+    store = ProgressStore(tmp_path/"progress.db", flush_interval=60)
+    store.record_completion("u1", "c", "s", "l1")
+    store.record_xp("u1", None)  # NOT NULL amount: the database rejects this row
+    store.record_xp("u1", 10)
+    store.flush()
+    assert count(store, "completions") == 1 and count(store, "xp_events") == 1
+    assert store.stats() == {"pending": 0, "dropped": 1}
+    assert "NOT NULL" in store.rejected[0][2]
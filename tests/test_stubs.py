@@ -0,0 +1,153 @@
+# tests/test_stubs.py — Agent client, streaming and source refresh against the local stub servers
+import os, time
+from pathlib import Path
+
+import pytest
+
+from benchmarks import stub_agent, stub_sources
+from core.agent_client import AgentClient, ResponseCache, payload_key
+from core.generation import AgentFailure, GenerationQueue, build_payload
+from core.refresh import LessonSource, SourceRefresher
+from core.streaming import LessonAssembler, StreamAborted
+
+COURSES = Path(__file__).resolve().parent.parent/"courses"
+
+def payload(lesson_key: str = "01.overview"):
+    return build_payload("LLM", "1.introduction", lesson_key, "markdown", "# Notes")
+
+def assemble(client, lesson_key):
+    assembler = LessonAssembler(("LLM", "1.introduction", lesson_key))
+    events = client.stream(payload(lesson_key))
+    try:
+        for event in events: assembler.feed(event)
+    finally:
+        events.close()
+    return assembler
+
+@pytest.fixture(scope="module")
+def agent():
+    """(generate URL, client addresses of the connections the stub accepted)."""
+    server, url = stub_agent.serve(COURSES, port=0)
+    accepted, process = [], server.process_request
+    server.process_request = lambda request, address: (accepted.append(address), process(request, address))
+    yield url, accepted
+    server.shutdown()
+    server.server_close()
+
+# ---------- AgentClient ----------
+def test_client_reuses_one_keep_alive_connection(agent):
+    url, accepted = agent
+    accepted.clear()
+    client = AgentClient(url)
+    for _ in range(5): assert client.generate(payload(), use_cache=False)["ok"]
+    assert client.requests_sent == 5
+    assert len(accepted) == 1
+
+def test_cache_serves_repeats_and_skips_failures(agent, tmp_path):
+    url, _ = agent
+    client = AgentClient(url, cache=ResponseCache(tmp_path))
+    first = client.generate(payload())
+    assert client.generate(payload()) == first
+    assert client.stats() == {"requests_sent": 1, "cache_hits": 1, "cache_misses": 1}
+    assert not client.generate(payload("fail01"))["ok"]
+    client.generate(payload("fail01"))
+    assert client.requests_sent == 3  # ok=false answers are never cached
+
+def test_cache_expires_entries_after_ttl(agent, tmp_path):
+    url, _ = agent
+    cache = ResponseCache(tmp_path, ttl_seconds=60)
+    client = AgentClient(url, cache=cache)
+    client.generate(payload())
+    path = cache._path(payload_key(payload()))
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    client.generate(payload())
+    assert client.requests_sent == 2
+    assert path.stat().st_mtime > old  # refetched and stored again
+
+def test_cache_trims_oldest_entries_over_max_bytes(tmp_path):
+    cache = ResponseCache(tmp_path)
+    now = time.time()
+    for n, key in enumerate(["aa01", "bb02"]):
+        cache.put(key, {"ok": True, "data": {"n": n}})
+        os.utime(cache._path(key), (now - 30 + n, now - 30 + n))
+    cache.max_bytes = 2 * cache._path("aa01").stat().st_size
+    cache.put("cc03", {"ok": True, "data": {"n": 2}})
+    assert cache.get("aa01") is None
+    assert cache.get("bb02") == {"ok": True, "data": {"n": 1}}
+    assert cache.get("cc03") == {"ok": True, "data": {"n": 2}}
+
+# ---------- Streaming ----------
+def test_stream_assembles_a_valid_lesson_and_caches_it(agent, tmp_path):
+    url, _ = agent
+    client = AgentClient(url, cache=ResponseCache(tmp_path))
+    first = assemble(client, "01.overview")
+    assert first.done and not [i for i in first.issues if i["level"] == "error"]
+    assert first.lesson["metadata"]["lesson_key"] == "01.overview"
+    assert assemble(client, "01.overview").lesson == first.lesson
+    assert client.requests_sent == 1
+
+def test_stream_aborts_on_a_malformed_quiz(agent, tmp_path):
+    url, _ = agent
+    client = AgentClient(url, cache=ResponseCache(tmp_path))
+    with pytest.raises(StreamAborted):
+        assemble(client, "bad01")
+    assert client.cache.get(payload_key(payload("bad01"))) is None
+
+def test_stream_reports_agent_failure(agent):
+    url, _ = agent
+    with pytest.raises(AgentFailure, match="stub failure"):
+        assemble(AgentClient(url), "fail01")
+
+# ---------- Source refresh ----------
+PAGE = "<html><head><title>{0}</title></head><body><nav>menu</nav><article><h1>{0}</h1><p>{1}</p></article></body></html>"
+
+@pytest.fixture
+def source_site(tmp_path):
+    """(page dir, base URL, responses per status) with three pages; lessons l0a and l0b share p0."""
+    root = tmp_path/"site"
+    root.mkdir()
+    for n in range(3): (root/f"p{n}.html").write_text(PAGE.format(f"Page {n}", "Original text."), encoding="utf-8")
+    server, base, counts = stub_sources.serve(root, port=0)
+    yield root, base, counts
+    server.shutdown()
+    server.server_close()
+
+def test_refresh_revalidates_and_regenerates_only_changed_text(source_site, tmp_path):
+    root, base, counts = source_site
+    sources = [LessonSource("C", "s", key, f"{base}/p{key[1]}.html") for key in ("l0a", "l0b", "l1", "l2")]
+    state = tmp_path/"refresh.json"
+
+    refresher = SourceRefresher(state)
+    assert refresher.refresh(sources) == []  # first sight: lessons count as current
+    assert refresher.last_run["downloaded"] == 3 and counts[200] == 3
+
+    refresher = SourceRefresher(state)  # validators and hashes survive a restart
+    assert refresher.refresh(sources) == []
+    assert refresher.last_run["not_modified"] == 3 and counts[304] == 3
+
+    (root/"p0.html").write_text(PAGE.format("Page 0", "Revised text."), encoding="utf-8")
+    (root/"p1.html").write_text(PAGE.format("Page 1", "Original text.").replace("menu", "new menu"), encoding="utf-8")
+    jobs = refresher.refresh(sources)
+    assert refresher.last_run["downloaded"] == 2 and refresher.last_run["not_modified"] == 1
+    assert sorted(j.lesson_key for j in jobs) == ["l0a", "l0b"]  # p1 changed only outside the readable text
+
+    for job in jobs: job.status = "saved"
+    refresher.settle(jobs)
+    assert SourceRefresher(state).refresh(sources) == []
+
+def test_queue_settles_refreshes_as_jobs_finish(source_site, tmp_path):
+    root, base, _ = source_site
+    sources = [LessonSource("C", "s", f"l{n}", f"{base}/p{n}.html") for n in range(3)]
+    state = tmp_path/"refresh.json"
+    refresher = SourceRefresher(state)
+    refresher.refresh(sources)
+    for n in (0, 1): (root/f"p{n}.html").write_text(PAGE.format(f"Page {n}", "Revised text."), encoding="utf-8")
+
+    generate = lambda payload: {"ok": payload["lesson_key"] != "l1", "data": {}}
+    queue = GenerationQueue(generate, lambda data: None, lambda job, data: "saved.json",
+                            on_finish=lambda job: refresher.settle([job]))
+    batch = queue.submit(refresher.refresh(sources))
+    while not queue.finished(batch): time.sleep(0.01)
+    assert refresher.pending == {}  # settled without anyone reading the batch
+    assert [j.lesson_key for j in SourceRefresher(state).refresh(sources)] == ["l1"]  # the failure is offered again